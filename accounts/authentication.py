@@ -0,0 +1,37 @@
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from core.metrics import observe_cache
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def get_user_cache_key(user_id):
+    return f"jwt-user-{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(get_user_cache_key(user_id))
+
+
+class CachedJWTCookieAuthentication(JWTCookieAuthentication):
+    """
+    Caches authenticated users by id for `JWT_USER_CACHE_TIMEOUT` seconds, so requests do not query the user.
+    Users are removed from the cache when saved or deleted. The default cache is per process,
+    so other processes may keep using a changed user until the timeout.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        observe_cache("jwt_user", user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        return user
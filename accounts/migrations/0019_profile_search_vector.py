@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from core.search import build_search_vector
+from django.db import migrations
+
+
+def update_search_vector(apps, schema_editor):
+    Profile = apps.get_model("accounts", "Profile")
+    Profile.objects.update(search_vector=build_search_vector(Profile, ["name", "description"]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_alter_profile_payment_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='accounts_pr_search__20c6e9_gin'),
+        ),
+        migrations.RunPython(update_search_vector, migrations.RunPython.noop),
+    ]
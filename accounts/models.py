@@ -1,12 +1,16 @@
+from core.search import SearchVectorQuerySet
 from core.storage_backends import PublicMediaStorage
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.files import storage
 from django.core.files.images import get_image_dimensions
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
@@ -39,6 +43,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
 
+    class Meta:
+        # Match `UPPER(column::text)` emitted by `istartswith` lookups used in autocomplete.
+        indexes = [
+            GinIndex(
+                OpClass(Upper(Cast(field, models.TextField())), name="gin_trgm_ops"),
+                name=f"accounts_user_{field}_trgm",
+            )
+            for field in ["email", "first_name", "last_name"]
+        ]
+
     def __str__(self):
         return self.email
 
@@ -66,3 +80,11 @@ class Profile(models.Model):
     portfolio = models.OneToOneField("album.Album", on_delete=models.PROTECT, blank=True)
     owner = models.OneToOneField(User, on_delete=models.CASCADE)
     created = models.DateTimeField(default=timezone.now)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorQuerySet.as_manager()
+
+    search_vector_fields = ["name", "description"]
+
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"])]
@@ -1,3 +1,5 @@
+from core.fieldsets import SparseFieldsetsMixin
+from core.values import ValuesListSerializer
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import LoginSerializer
 from django.db import transaction
@@ -37,14 +39,15 @@ class UserBasicInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "email", "first_name", "last_name"]
+        list_serializer_class = ValuesListSerializer
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     owner = UserBasicInfoSerializer(read_only=True)
 
     class Meta:
         model = Profile
-        fields = "__all__"
+        exclude = ["search_vector"]
         extra_kwargs = {
             "portfolio": {"read_only": True},
             "created": {"read_only": True},
@@ -52,10 +55,11 @@ class ProfileSerializer(serializers.ModelSerializer):
         }
 
 
-class ProfileListSerializer(serializers.ModelSerializer):
+class ProfileListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
-        exclude = ["payment_info", "portfolio", "owner"]
+        exclude = ["payment_info", "portfolio", "owner", "search_vector"]
+        list_serializer_class = ValuesListSerializer
 
 
 # class ProfileNestedSerializer(ProfileSerializer):
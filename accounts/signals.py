@@ -1,8 +1,11 @@
 from album.models import Album
-from django.db.models.signals import post_save, pre_save
+from core.search import search_vector_outdated
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from order.models import Order
 
-from .models import Profile
+from .authentication import invalidate_cached_user
+from .models import Profile, User
 
 
 @receiver(pre_save, sender=Profile)
@@ -13,8 +16,23 @@ def profile_pre_save(sender, instance, *args, **kwargs):
 
 
 @receiver(post_save, sender=Profile)
-def profile_post_save(sender, instance, created, *args, **kwargs):
+def profile_post_save(sender, instance, created, update_fields, *args, **kwargs):
     if created == True:
         user = instance.owner
         user.is_vendor = True
         user.save()
+
+    if search_vector_outdated(created, update_fields, Profile.search_vector_fields):
+        Profile.objects.filter(pk=instance.pk).update_search_vector()
+        Order.objects.filter(vendor=instance.owner_id).update_search_vector()
+
+
+@receiver(post_save, sender=User)
+def user_post_save(sender, instance, created, update_fields, *args, **kwargs):
+    if not created and search_vector_outdated(created, update_fields, ["first_name", "last_name", "email"]):
+        Order.objects.filter(client=instance.pk).update_search_vector()
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_invalidate_cache(sender, instance, *args, **kwargs):
+    invalidate_cached_user(instance.pk)
@@ -6,9 +6,12 @@ from core.tests_utils import (
     generate_photo_file,
     profile_detail_url,
     profile_list_url,
+    user_autocomplete_url,
 )
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
 
 class TestProfileViewset(APITestCase):
@@ -134,3 +137,70 @@ class TestProfileViewset(APITestCase):
         data = {"description": "DESC", "name": "NAME"}
         response = self.client.patch(profile_detail_url(profile_id), data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_search(self):
+        self.test_profile_create()
+        user = create_user(email="test2@test.com")
+        self.client.force_authenticate(user=user)
+        data = {"description": "Wedding photography", "name": "Studio"}
+        response = self.client.post(profile_list_url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(profile_list_url, {"search": "wedd"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [profile["name"] for profile in response.json()["results"]]
+        self.assertEqual(names, ["Studio"])
+        response = self.client.get(profile_list_url, {"search": "name"})
+        names = [profile["name"] for profile in response.json()["results"]]
+        self.assertEqual(names, ["NAME"])
+
+
+class TestUserViewSetAutocomplete(APITestCase):
+    def setUp(self):
+        self.user = create_user(email="john@test.com", first_name="John", last_name="Doe")
+        self.client.force_authenticate(user=self.user)
+        create_user(email="johanna@test.com", first_name="Johanna", last_name="Smith")
+        create_user(email="jo@test.com", first_name="Joe", last_name="Johnson")
+        create_user(email="anna@test.com", first_name="Anna", last_name="Kowalska")
+
+    def test_user_autocomplete(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(user_autocomplete_url, {"search": "jo"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        emails = [user["email"] for user in response.json()]
+        self.assertCountEqual(emails, ["johanna@test.com", "jo@test.com"])
+
+    def test_user_autocomplete_all_terms(self):
+        response = self.client.get(user_autocomplete_url, {"search": "jo smi"})
+        emails = [user["email"] for user in response.json()]
+        self.assertEqual(emails, ["johanna@test.com"])
+
+    def test_user_autocomplete_limit(self):
+        response = self.client.get(user_autocomplete_url, {"search": "jo", "limit": 1})
+        self.assertEqual(len(response.json()), 1)
+        response = self.client.get(user_autocomplete_url, {"search": "kowal"})
+        self.assertEqual(response.json()[0]["email"], "anna@test.com")
+        response = self.client.get(user_autocomplete_url)
+        self.assertEqual(response.json(), [])
+
+
+class TestCachedJWTAuthentication(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(email="test@test.com")
+        self.client.credentials(HTTP_AUTHORIZATION=f"JWT {RefreshToken.for_user(self.user).access_token}")
+
+    def test_authentication_caches_user(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(user_autocomplete_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(user_autocomplete_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_authentication_user_saved(self):
+        self.client.get(user_autocomplete_url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(user_autocomplete_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
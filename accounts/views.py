@@ -1,12 +1,21 @@
 from allauth.socialaccount.providers.facebook.views import FacebookOAuth2Adapter
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
+from core.fieldsets import fields_parameters
 from core.settings import CLIENT_URL
+from core.search import FullTextSearchFilter
 from core.utils import SwaggerOrderingFilter, SwaggerSearchFilter
+from core.values import ValuesListModelMixin
 from dj_rest_auth.registration.views import SocialLoginView
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -23,13 +32,15 @@ from .serializers import (
 )
 
 
-class UserViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class UserViewSet(ValuesListModelMixin, viewsets.GenericViewSet):
     queryset = User.objects.get_queryset().order_by("email")
     serializer_class = UserBasicInfoSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SwaggerSearchFilter]
     search_fields = ["email", "first_name", "last_name"]
     pagination_class = UserListPagination
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
 
     def filter_queryset(self, queryset):
         for backend in list(self.filter_backends):
@@ -37,17 +48,59 @@ class UserViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         queryset = queryset.exclude(id=self.request.user.id)
         return queryset
 
+    def get_autocomplete_limit(self):
+        try:
+            limit = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            return self.autocomplete_limit
+        return max(1, min(limit, self.autocomplete_max_limit))
 
+    @swagger_auto_schema(
+        operation_description="""
+        Top matches for users whose email, first name or last name start with every search term.
+        Results are ranked by trigram similarity and are not paginated.
+        """,
+        manual_parameters=[
+            openapi.Parameter(
+                "limit", openapi.IN_QUERY, description="Maximum number of results.", type=openapi.TYPE_INTEGER
+            )
+        ],
+    )
+    @action(detail=False, pagination_class=None)
+    def autocomplete(self, request, *args, **kwargs):
+        search_terms = SwaggerSearchFilter().get_search_terms(request)
+        if not search_terms:
+            return Response([])
+
+        query = Q()
+        for term in search_terms:
+            query &= Q(email__istartswith=term) | Q(first_name__istartswith=term) | Q(last_name__istartswith=term)
+        text = " ".join(search_terms)
+        similarity = Greatest(*[TrigramSimilarity(field, text) for field in self.search_fields])
+
+        queryset = (
+            User.objects.filter(query)
+            .exclude(id=request.user.id)
+            .only(*UserBasicInfoSerializer.Meta.fields)
+            .annotate(similarity=similarity)
+            .order_by("-similarity", "email")[: self.get_autocomplete_limit()]
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+@method_decorator(name="list", decorator=swagger_auto_schema(manual_parameters=fields_parameters))
+@method_decorator(name="retrieve", decorator=swagger_auto_schema(manual_parameters=fields_parameters))
 class ProfileViewSet(
     mixins.RetrieveModelMixin,
-    mixins.ListModelMixin,
+    ValuesListModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, SwaggerSearchFilter]
+    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, FullTextSearchFilter]
     search_fields = ["name", "description"]
     ordering_fields = ["name", "created"]
     ordering = ["name"]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from core.search import build_search_vector
+from django.db import migrations
+
+
+def update_search_vector(apps, schema_editor):
+    Album = apps.get_model("album", "Album")
+    Album.objects.update(search_vector=build_search_vector(Album, ["name"]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('album', '0018_alter_image_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='album_album_search__cac567_gin'),
+        ),
+        migrations.RunPython(update_search_vector, migrations.RunPython.noop),
+    ]
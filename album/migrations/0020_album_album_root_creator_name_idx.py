@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('album', '0019_album_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(condition=models.Q(('parent_album__isnull', True)), fields=['creator', 'name'], name='album_root_creator_name_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from accounts.models import User
+from core.search import SearchVectorQuerySet
 from core.storage_backends import PrivateMediaStorage
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill
@@ -17,6 +21,19 @@ class Album(models.Model):
     parent_album = models.ForeignKey("self", on_delete=models.CASCADE, null=True, blank=True)
     created = models.DateTimeField(default=timezone.now)
     is_public = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorQuerySet.as_manager()
+
+    search_vector_fields = ["name"]
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(
+                fields=["creator", "name"], name="album_root_creator_name_idx", condition=Q(parent_album__isnull=True)
+            ),
+        ]
 
 
 class Image(models.Model):
@@ -0,0 +1,42 @@
+from core.asgi_utils import authenticate, get_request, run_sync, send_exception, send_redirect
+from django.db.models import Exists, OuterRef
+from rest_framework import exceptions
+
+from .models import Album, Image
+
+
+def get_image_url(request, pk, thumbnail):
+    # Same rules as IsAuthorOrHasAccess in a single query.
+    user = authenticate(request)
+    queryset = (
+        Image.objects.filter(pk=pk)
+        .select_related("album")
+        .only("image", "height", "width", "author", "album__is_public")
+    )
+    if user.is_authenticated:
+        access = Album.allowed_users.through.objects.filter(album_id=OuterRef("album_id"), user_id=user.pk)
+        queryset = queryset.annotate(has_access=Exists(access))
+
+    image = queryset.first()
+    if image is None:
+        raise exceptions.NotFound({"pk": "No image matches the given image number."})
+    if not (image.album.is_public or image.author_id == user.pk or getattr(image, "has_access", False)):
+        raise exceptions.PermissionDenied() if user.is_authenticated else exceptions.NotAuthenticated()
+
+    return image.image_thumbnail.url if thumbnail else image.image.url
+
+
+async def image_redirect(scope, receive, send, album_pk, pk, thumbnail=False):
+    """
+    Async `ImageViewset.retrieve` and `thumbnail`, redirects to the image file in the storage.
+    """
+    request = get_request(scope)
+    try:
+        url = await run_sync(get_image_url, request, pk, thumbnail)
+    except exceptions.APIException as exc:
+        return await send_exception(send, request, exc)
+    await send_redirect(send, request, url)
+
+
+async def thumbnail_redirect(scope, receive, send, album_pk, pk):
+    await image_redirect(scope, receive, send, album_pk, pk, thumbnail=True)
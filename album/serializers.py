@@ -1,4 +1,7 @@
 from accounts.serializers import UserBasicInfoSerializer
+from core.fieldsets import SparseFieldsetsMixin
+from core.streaming import StreamingList
+from core.values import ValuesListSerializer
 from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.reverse import reverse
@@ -6,12 +9,13 @@ from rest_framework.reverse import reverse
 from .models import Album, Image
 
 
-class AlbumListSerializer(serializers.ModelSerializer):
+class AlbumListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     creator = UserBasicInfoSerializer(read_only=True)
 
     class Meta:
         model = Album
         fields = ["id", "creator", "name", "is_public", "created"]
+        list_serializer_class = ValuesListSerializer
 
 
 class AlbumCreateUpdateSerializer(serializers.ModelSerializer):
@@ -20,7 +24,7 @@ class AlbumCreateUpdateSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "parent_album", "is_public"]
 
 
-class AlbumSerializer(serializers.ModelSerializer):
+class AlbumSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
     child_albums = serializers.SerializerMethodField()
     allowed_users = serializers.SerializerMethodField()
@@ -30,7 +34,7 @@ class AlbumSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Album
-        fields = "__all__"
+        exclude = ["search_vector"]
         read_only_fields = ["created", "allowed_users"]
 
     def get_parent_album(self, obj):
@@ -47,7 +51,10 @@ class AlbumSerializer(serializers.ModelSerializer):
 
     def get_images(self, obj):
         images = obj.image_set.all()
-        return ImageSerializer(images, many=True, context={"request": self.context["request"]}).data
+        serializer = ImageSerializer(images, many=True, context={"request": self.context["request"]})
+        if self.context.get("stream_images"):
+            return StreamingList(images, serializer.child)
+        return serializer.data
 
     def get_child_albums(self, obj):
         user = self.context["request"].user
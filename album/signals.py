@@ -1,10 +1,11 @@
 import os
 import random
 
-from django.db.models.signals import pre_delete, pre_save
+from core.search import search_vector_outdated
+from django.db.models.signals import post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Image
+from .models import Album, Image
 
 
 def delete_image_kit_image_field(image_kit_field):
@@ -29,6 +30,12 @@ def image_pre_save(sender, instance, *args, **kwargs):
         instance.image.name = f"{filename}_{random.getrandbits(16)}_.{extension}"
 
 
+@receiver(post_save, sender=Album)
+def album_post_save(sender, instance, created, update_fields, *args, **kwargs):
+    if search_vector_outdated(created, update_fields, Album.search_vector_fields):
+        Album.objects.filter(pk=instance.pk).update_search_vector()
+
+
 @receiver(pre_delete, sender=Image)
 def image_pre_delete(sender, instance, *args, **kwargs):
     delete_image_kit_image_field(instance.image_thumbnail)
@@ -1,19 +1,28 @@
+import json
 import shutil
 
 from accounts.models import User
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from core.asgi import application
 from core.settings import TEST_DIR
 from core.tests_utils import (
     album_add_access_detail_url,
     album_detail_url,
     album_image_list_url,
     album_images_detail_url,
+    album_image_thumbnail_url,
     album_list_url,
     create_user,
     generate_photo_file,
     profile_list_url,
 )
+from django.test import override_settings
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Album, Image
 
 
 class TestAlbumViewSetCreateDestroy(APITestCase):
@@ -151,6 +160,67 @@ class TestAlbumViewSetUpdate(APITestCase):
         self.assertEqual(response_data, data)
 
 
+class TestAlbumViewSetSearch(APITestCase):
+    def setUp(self):
+        self.user = create_user(email="test@test.com", is_vendor=True)
+        self.client.force_authenticate(user=self.user)
+        for name in ["Summer wedding", "Winter wedding", "Holidays"]:
+            response = self.client.post(album_list_url, {"name": name})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_album_search_prefix(self):
+        response = self.client.get(album_list_url, {"search": "wedd"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [album["name"] for album in response.json()["results"]]
+        self.assertCountEqual(names, ["Summer wedding", "Winter wedding"])
+
+    def test_album_search_all_terms(self):
+        response = self.client.get(album_list_url, {"search": "wedding win"})
+        names = [album["name"] for album in response.json()["results"]]
+        self.assertEqual(names, ["Winter wedding"])
+
+    def test_album_search_after_rename(self):
+        response = self.client.get(album_list_url, {"search": "holidays"})
+        album_id = response.json()["results"][0]["id"]
+        response = self.client.patch(album_detail_url(album_id), {"name": "Vacation"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(album_list_url, {"search": "holidays"})
+        self.assertEqual(response.json()["count"], 0)
+        response = self.client.get(album_list_url, {"search": "vaca"})
+        self.assertEqual(response.json()["count"], 1)
+
+
+class TestAlbumSparseFieldsets(APITestCase):
+    def setUp(self):
+        self.user = create_user(email="test@test.com", is_vendor=True)
+        self.client.force_authenticate(user=self.user)
+        self.album = Album.objects.create(name="NAME", creator=self.user)
+        Album.objects.create(name="CHILD", creator=self.user, parent_album=self.album)
+
+    def test_album_detail_fields(self):
+        # The album and its creator for the permission check, none for the omitted fields.
+        with self.assertNumQueries(2):
+            response = self.client.get(album_detail_url(self.album.id), {"fields": "id,name,isPublic"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"id": self.album.id, "name": "NAME", "isPublic": False})
+
+    def test_album_detail_exclude(self):
+        response = self.client.get(album_detail_url(self.album.id), {"exclude": "images,childAlbums"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("images", response.json())
+        self.assertNotIn("childAlbums", response.json())
+        self.assertIn("allowedUsers", response.json())
+
+    def test_album_detail_unknown_field(self):
+        response = self.client.get(album_detail_url(self.album.id), {"fields": "id,unknownField"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["fields"], "Unknown fields: unknownField.")
+
+    def test_album_list_fields(self):
+        response = self.client.get(album_list_url, {"fields": "id,name"})
+        self.assertEqual(response.json()["results"], [{"id": self.album.id, "name": "NAME"}])
+
+
 class TestAlbumAllowedUsersViewSet(APITestCase):
     data = {"name": "NAME"}
 
@@ -287,3 +357,98 @@ class TestAlbumImageViewSet(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.delete(album_images_detail_url(self.album_id, self.image_id))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class TestAlbumImageRedirects(APITransactionTestCase):
+    def setUp(self):
+        self.user = create_user("test@test.com", is_vendor=True)
+        self.other = create_user("other@test.com")
+        self.album = Album.objects.create(name="NAME", creator=self.user)
+        # Created without signals, which would generate the thumbnail in the storage.
+        (self.image,) = Image.objects.bulk_create(
+            [Image(image="users/test.png", height=100, width=100, author=self.user, album=self.album)]
+        )
+
+    async def get(self, url, user=None, host=b"testserver"):
+        headers = [(b"host", host)]
+        if user is not None:
+            headers.append((b"cookie", f"access-token={RefreshToken.for_user(user).access_token}".encode()))
+        scope = {"type": "http", "method": "GET", "path": url, "query_string": b"", "headers": headers}
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        await communicator.receive_output(timeout=5)
+        return start["status"], dict(start["headers"])
+
+    async def test_album_image_redirect(self):
+        status_code, headers = await self.get(album_images_detail_url(self.album.id, self.image.id), self.user)
+        self.assertEqual(status_code, status.HTTP_302_FOUND)
+        self.assertIn("users/test.png", headers[b"location"].decode())
+        self.assertEqual(headers[b"x-content-type-options"], b"nosniff")
+
+        status_code, headers = await self.get(album_image_thumbnail_url(self.album.id, self.image.id), self.user)
+        self.assertEqual(status_code, status.HTTP_302_FOUND)
+        self.assertIn("users/test", headers[b"location"].decode())
+
+    async def test_album_image_redirect_permissions(self):
+        url = album_images_detail_url(self.album.id, self.image.id)
+        self.assertEqual((await self.get(url))[0], status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual((await self.get(url, self.other))[0], status.HTTP_403_FORBIDDEN)
+        missing_url = album_images_detail_url(self.album.id, self.image.id + 1)
+        self.assertEqual((await self.get(missing_url, self.user))[0], status.HTTP_404_NOT_FOUND)
+
+        await sync_to_async(self.album.allowed_users.add)(self.other)
+        self.assertEqual((await self.get(url, self.other))[0], status.HTTP_302_FOUND)
+        await sync_to_async(Album.objects.filter(pk=self.album.pk).update)(is_public=True)
+        self.assertEqual((await self.get(url))[0], status.HTTP_302_FOUND)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    async def test_album_image_redirect_disallowed_host(self):
+        url = album_images_detail_url(self.album.id, self.image.id)
+        self.assertEqual((await self.get(url, self.user, host=b"evil.com"))[0], status.HTTP_400_BAD_REQUEST)
+
+
+class TestAlbumDetailStreaming(APITransactionTestCase):
+    def setUp(self):
+        self.user = create_user("test@test.com", is_vendor=True)
+        self.album = Album.objects.create(name="NAME", creator=self.user)
+        Image.objects.bulk_create(
+            Image(image=f"users/test{i}.png", height=100, width=100, author=self.user, album=self.album)
+            for i in range(3)
+        )
+
+    def test_album_detail_streams_images(self):
+        self.client.force_authenticate(user=self.user)
+        with override_settings(ALBUM_STREAMING_MIN_IMAGES=2):
+            streamed = self.client.get(album_detail_url(self.album.id))
+        self.assertTrue(streamed.streaming)
+        with override_settings(ALBUM_STREAMING_MIN_IMAGES=10):
+            rendered = self.client.get(album_detail_url(self.album.id))
+        self.assertFalse(rendered.streaming)
+        self.assertEqual(b"".join(streamed.streaming_content), rendered.content)
+
+    @override_settings(ALBUM_STREAMING_MIN_IMAGES=2)
+    async def test_album_detail_streams_over_asgi(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        headers = [(b"host", b"testserver"), (b"cookie", f"access-token={token}".encode())]
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": album_detail_url(self.album.id),
+            "query_string": b"",
+            "headers": headers,
+        }
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+
+        messages = []
+        while True:
+            messages.append(await communicator.receive_output(timeout=5))
+            if not messages[-1].get("more_body"):
+                break
+        body = b"".join(message.get("body", b"") for message in messages)
+        self.assertEqual(len(json.loads(body)["images"]), 3)
+        # Parts are sent in batches, the small response in one body message and the closing empty one.
+        self.assertEqual(len(messages), 2)
@@ -1,5 +1,10 @@
 from accounts.models import User
-from core.utils import SwaggerOrderingFilter, SwaggerSearchFilter
+from core.fieldsets import fields_parameters, is_field_requested
+from core.search import FullTextSearchFilter
+from core.streaming import can_stream, get_streaming_response
+from core.utils import SwaggerOrderingFilter
+from core.values import ValuesListModelMixin
+from django.conf import settings
 from django.db.models import Q
 from django.db.models.query import QuerySet
 from django.http.response import HttpResponseRedirect
@@ -58,14 +63,15 @@ class AlbumFilter(filters.FilterSet):
         operation_description="To create an album, a user must first create a profile.\nThe album is public by default."
     ),
 )
+@method_decorator(name="list", decorator=swagger_auto_schema(manual_parameters=fields_parameters))
 class AlbumViewset(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ValuesListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Album.objects.all()
     serializer_class = AlbumSerializer
-    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, SwaggerSearchFilter]
+    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, FullTextSearchFilter]
     filterset_class = AlbumFilter
     # search_fields = ["name", "creator__first_name", "creator__last_name", "creator__email"]
     search_fields = ["name"]
@@ -118,11 +124,22 @@ class AlbumViewset(
         serializer.validated_data["creator"] = self.request.user
         serializer.save()
 
+    @swagger_auto_schema(manual_parameters=fields_parameters)
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        serializer = AlbumSerializer(instance, context={"request": request})
+        stream_images = self.should_stream_images(instance)
+        serializer = AlbumSerializer(instance, context={"request": request, "stream_images": stream_images})
+        if stream_images:
+            return get_streaming_response(serializer.data)
         return Response(serializer.data)
 
+    def should_stream_images(self, instance):
+        return (
+            can_stream(self.request)
+            and is_field_requested(self.request, "images")
+            and instance.image_set.all()[settings.ALBUM_STREAMING_MIN_IMAGES :].exists()
+        )
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         try:
@@ -8,9 +8,48 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
 import os
+import re
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+# Same as get_asgi_application(), with the handler reading streaming responses outside of the event loop.
+django.setup(set_prefix=False)
+
+from core.streaming import StreamingASGIHandler  # noqa: E402
+
+django_application = StreamingASGIHandler()
+
+# Imported after Django is set up. These views are async and bypass the Django request cycle,
+# streams because they are long-lived, redirects because they are hot and only need one query.
+# None of MIDDLEWARE runs for them: the host is checked by is_allowed_host, the CORS, security and X-Frame-Options
+# headers are added by get_response_headers and requests of the redirects are counted by observed_asgi_view.
+# They have no Server-Timing header, slow request logs, sessions or CSRF checks, which they do not need.
+from album.redirects import image_redirect, thumbnail_redirect  # noqa: E402
+from core.asgi_utils import is_allowed_host  # noqa: E402
+from core.metrics import observed_asgi_view  # noqa: E402
+from order.streams import order_notes_stream  # noqa: E402
+
+asgi_routes = [
+    (
+        re.compile(r"^/albums/(?P<album_pk>\d+)/images/(?P<pk>\d+)/$"),
+        observed_asgi_view("album-images-detail", image_redirect),
+    ),
+    (
+        re.compile(r"^/albums/(?P<album_pk>\d+)/images/(?P<pk>\d+)/thumbnail/$"),
+        observed_asgi_view("album-images-thumbnail", thumbnail_redirect),
+    ),
+    (re.compile(r"^/orders/(?P<order_pk>\d+)/notes/stream/$"), order_notes_stream),
+]
+
+
+async def application(scope, receive, send):
+    # Other methods, e.g. updating or deleting images, are left to the REST views.
+    if scope["type"] == "http" and scope["method"] == "GET":
+        for pattern, view in asgi_routes:
+            match = pattern.match(scope["path"])
+            # Requests to other hosts are left to Django, which rejects them.
+            if match and is_allowed_host(scope):
+                return await view(scope, receive, send, **match.groupdict())
+    return await django_application(scope, receive, send)
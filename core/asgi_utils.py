@@ -0,0 +1,89 @@
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework.settings import api_settings
+
+
+def get_request(scope):
+    return ASGIRequest(scope, io.BytesIO())
+
+
+def is_allowed_host(scope):
+    # Same check as CommonMiddleware, the Django request cycle answers other hosts with 400 Bad Request.
+    try:
+        get_request(scope).get_host()
+    except DisallowedHost:
+        return False
+    return True
+
+
+def authenticate(request):
+    # Same authentication classes as the REST endpoints, raises their APIException on invalid credentials.
+    for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        user_auth_tuple = authenticator().authenticate(request)
+        if user_auth_tuple is not None:
+            return user_auth_tuple[0]
+    return AnonymousUser()
+
+
+def with_connection(func):
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+async def run_sync(func, *args):
+    """
+    Runs the database work of an ASGI view in the thread pool.
+    It is not bound to the thread of sync views, so these views do not wait for them.
+    """
+    return await sync_to_async(with_connection(func), thread_sensitive=False)(*args)
+
+
+def get_cors_headers(request):
+    origin = request.headers.get("Origin")
+    if origin is None or not (settings.CORS_ALLOW_ALL_ORIGINS or origin in settings.CORS_ALLOWED_ORIGINS):
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode()),
+        (b"access-control-allow-credentials", b"true"),
+    ]
+
+
+def get_response_headers(request):
+    """
+    Headers which CorsMiddleware, SecurityMiddleware and XFrameOptionsMiddleware add to the responses of Django.
+    """
+    headers = get_cors_headers(request)
+    if settings.SECURE_CONTENT_TYPE_NOSNIFF:
+        headers.append((b"x-content-type-options", b"nosniff"))
+    if settings.SECURE_REFERRER_POLICY:
+        headers.append((b"referrer-policy", settings.SECURE_REFERRER_POLICY.encode()))
+    return headers + [(b"x-frame-options", settings.X_FRAME_OPTIONS.encode())]
+
+
+async def send_response(send, status, headers, body=b""):
+    headers = headers + [(b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_exception(send, request, exc):
+    headers = get_response_headers(request) + [(b"content-type", b"application/json")]
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    await send_response(send, exc.status_code, headers, json.dumps(detail).encode())
+
+
+async def send_redirect(send, request, url):
+    await send_response(send, 302, get_response_headers(request) + [(b"location", url.encode())])
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class LocalBroker:
+    """
+    In-process publish/subscribe broker.
+    Messages only reach subscribers of the same process, a shared broker has to provide the same
+    `publish` and `subscribe` methods to serve more than one ASGI worker.
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, message):
+        # Called from sync code, possibly in another thread than the subscribers' event loops.
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.put, queue, message)
+            except RuntimeError:
+                # The subscriber's loop is already closed.
+                pass
+
+    @staticmethod
+    def put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow subscribers lose messages instead of growing the queue without bound.
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_queue_size))
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self.lock:
+                subscribers = self.subscribers.get(channel, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self.subscribers.pop(channel, None)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.BROKER_BACKEND)()
@@ -0,0 +1,24 @@
+from imagekit.cachefiles.backends import CacheFileState, Simple
+
+from .metrics import observe_cache, thumbnail_generation_duration
+
+
+class InstrumentedCachefileBackend(Simple):
+    """
+    Imagekit's `Simple` backend observing the hits of its file state cache and the duration of generating files.
+    """
+
+    def get_state(self, file, check_if_unknown=True):
+        state = super().get_state(file, check_if_unknown=False)
+        observe_cache("imagekit_state", state is not None)
+        if state is None and check_if_unknown:
+            state = super().get_state(file)
+        return state
+
+    def generate_now(self, file, force=False):
+        if force or self.get_state(file) not in (CacheFileState.GENERATING, CacheFileState.EXISTS):
+            self.set_state(file, CacheFileState.GENERATING)
+            with thumbnail_generation_duration.time():
+                file._generate()
+            self.set_state(file, CacheFileState.EXISTS)
+            file.close()
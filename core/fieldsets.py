@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+from drf_yasg import openapi
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .parsers import underscore_key
+from .renderers import camelize_key
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+fields_parameters = [
+    openapi.Parameter(
+        FIELDS_PARAM,
+        openapi.IN_QUERY,
+        description="Comma separated fields to return, other fields are omitted and not computed.",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        EXCLUDE_PARAM,
+        openapi.IN_QUERY,
+        description="Comma separated fields to omit.",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+
+def get_param_fields(request, param):
+    if request is None or request.method not in SAFE_METHODS or param not in request.query_params:
+        return None
+    # Names as in the responses, camelCase, snake_case names are left as they are.
+    return {underscore_key(name.strip()) for name in request.query_params[param].split(",") if name.strip()}
+
+
+def is_field_requested(request, name):
+    """
+    Whether the response of a GET request includes the top level field `name`,
+    for views to skip the joins and annotations only omitted fields read.
+    """
+    fields = get_param_fields(request, FIELDS_PARAM)
+    exclude = get_param_fields(request, EXCLUDE_PARAM) or set()
+    return (fields is None or name in fields) and name not in exclude
+
+
+def select_requested_related(queryset, request, related):
+    """
+    `related` maps fields to the `select_related` lookups they read, only lookups of requested fields are joined.
+    """
+    lookups = {lookup for name, lookups in related.items() if is_field_requested(request, name) for lookup in lookups}
+    # select_related() without lookups would join every foreign key.
+    return queryset.select_related(*lookups) if lookups else queryset
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin omitting the fields left out by the `fields` and `exclude` query parameters of GET requests.
+    Omitted method fields and nested serializers are not evaluated at all.
+    Only applies to the serializer of the response, not when it is nested in another one.
+    """
+
+    def is_response_serializer(self):
+        parent = getattr(self, "parent", None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, "parent", None)
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if not self.is_response_serializer():
+            return fields
+
+        for param in [FIELDS_PARAM, EXCLUDE_PARAM]:
+            unknown = (get_param_fields(request, param) or set()).difference(fields)
+            if unknown:
+                names = ", ".join(sorted(camelize_key(name) for name in unknown))
+                raise ValidationError({param: f"Unknown fields: {names}."})
+        return OrderedDict((name, field) for name, field in fields.items() if is_field_requested(request, name))
@@ -0,0 +1,160 @@
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import get_route, observe_request, observe_storage_call
+
+logger = logging.getLogger(__name__)
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+# Calls kept per request for slow request snapshots, the calls after them are only counted.
+MAX_RECORDED_CALLS = 1000
+
+
+class Timing:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.calls = []
+
+    def add(self, duration, call=None):
+        self.count += 1
+        self.duration += duration
+        if call is not None and len(self.calls) < MAX_RECORDED_CALLS:
+            self.calls.append((call, duration))
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+class RequestMetrics:
+    """
+    Number and time of the database queries and storage calls made while handling a request.
+    The calls themselves are only recorded with `record_calls`, while a slow request snapshot may be taken.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db = Timing()
+        self.storage = Timing()
+        self.record_calls = False
+
+    @property
+    def duration_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def get_server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db.duration_ms:.1f};desc="{self.db.count} queries"',
+                f'storage;dur={self.storage.duration_ms:.1f};desc="{self.storage.count} calls"',
+                f"app;dur={self.duration_ms:.1f}",
+            ]
+        )
+
+    def as_dict(self):
+        return {
+            "duration_ms": round(self.duration_ms, 1),
+            "db_queries": self.db.count,
+            "db_ms": round(self.db.duration_ms, 1),
+            "storage_calls": self.storage.count,
+            "storage_ms": round(self.storage.duration_ms, 1),
+        }
+
+
+def time_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db.add(time.perf_counter() - start, sql if metrics.record_calls else None)
+
+
+class InstrumentedStorageMixin:
+    """
+    Storage mixin timing the calls to the backend, in the metrics of the current request and in Prometheus.
+    """
+
+    def timed(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            observe_storage_call(type(self).__name__, method.__name__, duration)
+            metrics = current_metrics.get()
+            if metrics is not None:
+                call = (method.__name__.lstrip("_"), args[0] if args else None) if metrics.record_calls else None
+                metrics.storage.add(duration, call)
+
+    def _open(self, name, mode="rb"):
+        return self.timed(super()._open, name, mode)
+
+    def _save(self, name, content):
+        return self.timed(super()._save, name, content)
+
+    def delete(self, name):
+        return self.timed(super().delete, name)
+
+    def exists(self, name):
+        return self.timed(super().exists, name)
+
+    def listdir(self, path):
+        return self.timed(super().listdir, path)
+
+    def size(self, name):
+        return self.timed(super().size, name)
+
+    def get_modified_time(self, name):
+        return self.timed(super().get_modified_time, name)
+
+    def url(self, name, *args, **kwargs):
+        return self.timed(super().url, name, *args, **kwargs)
+
+
+def sends_server_timing(request):
+    # The header reveals how requests are handled, it is only sent to staff users unless enabled for everyone.
+    user = getattr(request, "user", None)
+    return settings.SERVER_TIMING or settings.DEBUG or user is not None and user.is_staff
+
+
+class ServerTimingMiddleware:
+    """
+    Counts and times the database queries and storage calls of every request, reports them in
+    the `Server-Timing` header, logs them in a `key=value` line of the `core.instrumentation` logger
+    at DEBUG level and observes them in the route's Prometheus metrics.
+    Bodies of streaming responses are rendered after the headers are sent and are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(time_query))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        if sends_server_timing(request):
+            response["Server-Timing"] = metrics.get_server_timing()
+        observe_request(
+            get_route(request), request.method, response.status_code, metrics.duration_ms / 1000, metrics.db.count
+        )
+        data = {"method": request.method, "path": request.path, "status": response.status_code, **metrics.as_dict()}
+        logger.debug(" ".join(f"{key}={value}" for key, value in data.items()), extra={"request_metrics": data})
+        return response
@@ -0,0 +1,231 @@
+import http.client
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from accounts.models import User
+from album.models import Album, Image
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.utils import timezone
+from order.models import Order
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(values, percent):
+    # Nearest rank, values are sorted.
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def get_queries(server_timing):
+    # Set by ServerTimingMiddleware, the async views served outside of Django do not report queries.
+    match = SERVER_TIMING_QUERIES.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+class InProcessClient:
+    """
+    Sends requests through Django's handler in this process, without a server. It is the WSGI request cycle
+    of the test client, the async views of core.asgi are only benchmarked with --url against an ASGI server.
+    """
+
+    def __init__(self, token):
+        self.client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"JWT {token}")
+
+    def request(self, method, path, data):
+        body = json.dumps(data) if data is not None else ""
+        response = self.client.generic(method, path, body, content_type="application/json")
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, response.get("Server-Timing"), len(content)
+
+    def close(self):
+        # Every thread has its own database connection.
+        connections.close_all()
+
+
+class HTTPClient:
+    """
+    Sends requests to a running server over one keep-alive connection, redirects are not followed.
+    """
+
+    def __init__(self, token, url):
+        url = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(url.netloc)
+        self.headers = {"Authorization": f"JWT {token}", "Content-Type": "application/json"}
+
+    def request(self, method, path, data):
+        body = json.dumps(data) if data is not None else None
+        self.connection.request(method, path, body, self.headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        return response.status, response.getheader("Server-Timing"), len(content)
+
+    def close(self):
+        self.connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends concurrent requests to the main API routes as a user of the dataset generated by seed_dataset, "
+        "reports throughput, latency percentiles, queries per request and bytes per response. "
+        "Without --url requests are handled in this process, where threads share the GIL. "
+        "Queries are read from the Server-Timing header, which a server only sends to everyone with SERVER_TIMING=true. "
+        "The order-update route changes the cost of an order of the user, which is restored after the run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Base URL of a running server, e.g. http://localhost:8000.")
+        parser.add_argument("--prefix", default="seed", help="Prefix of the seed_dataset users.")
+        parser.add_argument("--user", type=int, help="Id of the vendor sending the requests.")
+        parser.add_argument("--requests", type=int, default=200, help="Number of timed requests of every route.")
+        parser.add_argument("--warmup", type=int, default=5, help="Number of untimed requests of every route.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent clients.")
+        parser.add_argument("--routes", nargs="+", help="Names of the routes to run, all of them by default.")
+        parser.add_argument("--output", help="JSON file the results are written to.")
+        parser.add_argument("--compare", help="JSON file of a previous run to compare the latency with.")
+
+    def get_vendor(self, options):
+        users = User.objects.filter(is_vendor=True, profile__isnull=False)
+        if options["user"]:
+            users = users.filter(pk=options["user"])
+        else:
+            users = users.filter(email__startswith=f"{options['prefix']}_")
+        vendor = users.order_by("pk").first()
+        if vendor is None:
+            raise CommandError("There is no vendor to send the requests as, run seed_dataset or use --user.")
+        return vendor
+
+    def get_routes(self, vendor):
+        """
+        Yields `(name, method, path, data)` of every benchmarked route, for data of `vendor`.
+        """
+        yield "album-list", "GET", reverse("album-list"), None
+        yield "profile-list", "GET", reverse("profile-list"), None
+        yield "user-list", "GET", f"{reverse('user-list')}?search=First1", None
+        yield "user-autocomplete", "GET", f"{reverse('user-autocomplete')}?search=First1", None
+        yield "order-list", "GET", reverse("order-list"), None
+
+        album = Album.objects.filter(creator=vendor, image__isnull=False).order_by("pk").first()
+        if album is not None:
+            yield "album-detail", "GET", reverse("album-detail", args=[album.pk]), None
+            image = Image.objects.filter(album=album).order_by("pk").first()
+            yield "album-images-thumbnail", "GET", reverse("album-images-thumbnail", args=[album.pk, image.pk]), None
+
+        order = Order.objects.filter(vendor=vendor).order_by("pk").first()
+        if order is not None:
+            yield "order-notes-list", "GET", reverse("order-notes-list", args=[order.pk]), None
+        # Status in which vendors can change the cost.
+        order = Order.objects.filter(vendor=vendor, status=3).order_by("pk").first()
+        if order is not None:
+            try:
+                yield "order-update", "PATCH", reverse("order-detail", args=[order.pk]), {"cost": 1000}
+            finally:
+                # Saved rather than updated, so signals keep the order stats in sync.
+                order.save(update_fields=["cost"])
+
+    def get_client(self, token, options):
+        return HTTPClient(token, options["url"]) if options["url"] else InProcessClient(token)
+
+    def run_route(self, token, method, path, data, options):
+        results = []
+        lock = threading.Lock()
+        remaining = [options["requests"]]
+
+        def worker():
+            client = self.get_client(token, options)
+            try:
+                for _ in range(math.ceil(options["warmup"] / options["concurrency"])):
+                    client.request(method, path, data)
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                    start = time.perf_counter()
+                    status, server_timing, size = client.request(method, path, data)
+                    latency = time.perf_counter() - start
+                    with lock:
+                        results.append((latency, status, get_queries(server_timing), size))
+            finally:
+                client.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            for future in [executor.submit(worker) for _ in range(options["concurrency"])]:
+                future.result()
+        return results, time.perf_counter() - start
+
+    def summarize(self, name, method, path, results, duration):
+        latencies = sorted(latency * 1000 for latency, _, _, _ in results)
+        queries = [queries for _, _, queries, _ in results if queries is not None]
+        return {
+            "name": name,
+            "method": method,
+            "path": path,
+            "requests": len(results),
+            "errors": sum(1 for _, status, _, _ in results if status >= 400),
+            "throughput_rps": round(len(results) / duration, 1),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "mean": round(sum(latencies) / len(latencies), 2),
+                "max": round(latencies[-1], 2),
+            },
+            "queries_per_request": round(sum(queries) / len(queries), 1) if queries else None,
+            "bytes_per_response": round(sum(size for _, _, _, size in results) / len(results)),
+        }
+
+    def write_route(self, route, previous):
+        latency = route["latency_ms"]
+        line = (
+            f"{route['name']:<24} {route['throughput_rps']:>8} req/s  p50 {latency['p50']:>8} ms  "
+            f"p95 {latency['p95']:>8} ms  p99 {latency['p99']:>8} ms  {route['queries_per_request']} queries  "
+            f"{route['bytes_per_response']} B  {route['errors']} errors"
+        )
+        if previous is not None:
+            change = (latency["p95"] - previous["latency_ms"]["p95"]) / previous["latency_ms"]["p95"] * 100
+            line += f"  p95 {change:+.0f}%"
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        previous = {}
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                previous = {route["name"]: route for route in json.load(file)["routes"]}
+
+        vendor = self.get_vendor(options)
+        token = str(RefreshToken.for_user(vendor).access_token)
+        routes = []
+        # The vendor is not a staff user, the header is enabled for the requests handled in this process.
+        with override_settings(SERVER_TIMING=True):
+            for name, method, path, data in self.get_routes(vendor):
+                if options["routes"] and name not in options["routes"]:
+                    continue
+                results, duration = self.run_route(token, method, path, data, options)
+                routes.append(self.summarize(name, method, path, results, duration))
+                self.write_route(routes[-1], previous.get(name))
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "target": options["url"] or "in-process",
+            "user": vendor.pk,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "routes": routes,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
@@ -0,0 +1,257 @@
+import ctypes
+import ctypes.util
+import gc
+import json
+import math
+import os
+import resource
+import shutil
+import time
+from io import BytesIO
+from tempfile import TemporaryDirectory, mkdtemp
+
+from accounts.models import User
+from album.models import Album, Image
+from album.serializers import ImageUploadSerializer
+from core.storage_backends import PrivateMediaStorage
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from PIL import Image as PILImage
+
+# Name -> PIL format and mode of the uploaded files.
+FORMATS = {"jpeg": ("JPEG", "RGB"), "png": ("PNG", "RGB"), "rgba": ("PNG", "RGBA")}
+
+
+class StandInObject:
+    def __init__(self, bucket, key):
+        self.bucket = bucket
+        self.key = key
+
+    def upload_fileobj(self, content, ExtraArgs=None):
+        self.bucket.write(self.key, content)
+
+
+class MemoryBucket:
+    """
+    Stand-in of the boto3 bucket, keeping objects in memory.
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    def Object(self, key):
+        return StandInObject(self, key)
+
+    def write(self, key, content):
+        self.objects[key] = content.read()
+
+    def read(self, key):
+        return self.objects[key]
+
+    def exists(self, key):
+        return key in self.objects
+
+
+class DiskBucket(MemoryBucket):
+    """
+    Stand-in of the boto3 bucket, writing objects to files in `directory`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def write(self, key, content):
+        os.makedirs(os.path.dirname(self.get_path(key)), exist_ok=True)
+        with open(self.get_path(key), "wb") as file:
+            shutil.copyfileobj(content, file)
+
+    def read(self, key):
+        with open(self.get_path(key), "rb") as file:
+            return file.read()
+
+    def exists(self, key):
+        return os.path.exists(self.get_path(key))
+
+
+class StandInPrivateMediaStorage(PrivateMediaStorage):
+    """
+    `PrivateMediaStorage` uploading to `stand_in_bucket` instead of S3, the rest of its code path is the same.
+    Imagekit creates its own instance from the class path, so the bucket is set on the class.
+    """
+
+    stand_in_bucket = None
+
+    @property
+    def bucket(self):
+        return self.stand_in_bucket
+
+    def get_key(self, name):
+        return self._normalize_name(self._clean_name(name))
+
+    def exists(self, name):
+        return self.stand_in_bucket.exists(self.get_key(name))
+
+    def _open(self, name, mode="rb"):
+        return ContentFile(self.stand_in_bucket.read(self.get_key(name)), name=name)
+
+    def url(self, name, *args, **kwargs):
+        return f"/{self.get_key(name)}"
+
+
+def generate_source(megapixels, format, mode):
+    width = int(math.sqrt(megapixels * 1000000 * 4 / 3))
+    height = int(width * 3 / 4)
+    # Gradients with noise, which compress about as well as photos, unlike flat or random images.
+    bands = [
+        PILImage.linear_gradient("L").resize((width, height)),
+        PILImage.radial_gradient("L").resize((width, height)),
+        PILImage.effect_noise((width, height), 64),
+    ]
+    if mode == "RGBA":
+        bands.append(PILImage.linear_gradient("L").rotate(90).resize((width, height)))
+    file = BytesIO()
+    PILImage.merge(mode, bands).save(file, format)
+    return file.getvalue(), (width, height)
+
+
+def get_memory_mb(field):
+    # Resident and peak resident memory of the process, Linux only.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def release_memory():
+    # Freed memory stays resident in glibc's heap, it would hide the memory of the next measurement.
+    gc.collect()
+    try:
+        ctypes.CDLL(ctypes.util.find_library("c")).malloc_trim(0)
+    except (AttributeError, OSError):
+        pass
+
+
+def reset_peak_memory():
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the throughput and memory of uploading images with ImageUploadSerializer, generating their "
+        "thumbnails and saving files with PrivateMediaStorage, with a stand-in of the S3 bucket."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--megapixels", type=float, nargs="+", default=[1, 12, 24, 50])
+        parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+        parser.add_argument("--repeat", type=int, default=3, help="Number of images processed by every stage.")
+        parser.add_argument("--storage", choices=["memory", "disk"], default="memory", help="Stand-in of S3.")
+        parser.add_argument("--output", help="JSON file the results are written to.")
+
+    def measure(self, func):
+        """
+        Runs `func` --repeat times, returns its throughput and the memory one call needs on top of the process.
+        """
+        repeat = self.repeat
+        release_memory()
+        peak_resettable = reset_peak_memory()
+        baseline = get_memory_mb("VmRSS")
+        start, cpu_start = time.perf_counter(), time.process_time()
+        for _ in range(repeat):
+            func()
+        duration, cpu_duration = time.perf_counter() - start, time.process_time() - cpu_start
+
+        if peak_resettable and baseline is not None:
+            peak = get_memory_mb("VmHWM") - baseline
+        else:
+            # Peak of the whole process, which only grows, when it cannot be reset.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return {
+            "images_per_second": round(repeat / duration, 2),
+            # The pipeline runs on one core, so images per CPU second are images per second of every core.
+            "images_per_core_second": round(repeat / cpu_duration, 2) if cpu_duration else None,
+            "memory_mb_per_upload": round(peak, 1),
+        }
+
+    def upload(self, data, name, author, album):
+        serializer = ImageUploadSerializer(data={"image": SimpleUploadedFile(name, data)})
+        serializer.is_valid(raise_exception=True)
+        # Also runs image_pre_save and generates the thumbnail, IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY is Optimistic.
+        return serializer.save(author=author, album=album)
+
+    def run_case(self, format_name, megapixels, author, album):
+        format, mode = FORMATS[format_name]
+        data, size = generate_source(megapixels, format, mode)
+        name = f"benchmark.{format.lower()}"
+        # Files of the previous cases are not kept in memory.
+        StandInPrivateMediaStorage.stand_in_bucket = self.create_bucket()
+        storage = StandInPrivateMediaStorage()
+        images = []
+
+        stages = {
+            "storage": lambda: storage._save(storage.get_available_name(name), ContentFile(data)),
+            "upload": lambda: images.append(self.upload(data, name, author, album)),
+            "thumbnail": lambda: images[-1].image_thumbnail.generate(force=True),
+        }
+        for stage, func in stages.items():
+            result = {
+                "format": format_name,
+                "megapixels": megapixels,
+                "size": size,
+                "file_mb": round(len(data) / 2**20, 2),
+            }
+            result.update(stage=stage, **self.measure(func))
+            yield result
+
+    def write_result(self, result):
+        self.stdout.write(
+            f"{result['format']:<5} {result['megapixels']:>5} MP  {result['stage']:<9} "
+            f"{result['images_per_second']:>8} images/s  {result['images_per_core_second']} images/core-s  "
+            f"{result['memory_mb_per_upload']} MB per upload"
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        image_field = Image._meta.get_field("image")
+        storage_path = f"{StandInPrivateMediaStorage.__module__}.{StandInPrivateMediaStorage.__name__}"
+        results = []
+
+        with TemporaryDirectory() as directory, transaction.atomic():
+            if options["storage"] == "disk":
+                self.create_bucket = lambda: DiskBucket(mkdtemp(dir=directory))
+            else:
+                self.create_bucket = MemoryBucket
+            original_storage, image_field.storage = image_field.storage, StandInPrivateMediaStorage()
+            try:
+                with override_settings(IMAGEKIT_DEFAULT_FILE_STORAGE=storage_path):
+                    author = User.objects.create(email="benchmark_images@example.com", password=make_password(None))
+                    album = Album.objects.create(name="Benchmark", creator=author)
+                    for format_name in options["formats"]:
+                        for megapixels in options["megapixels"]:
+                            for result in self.run_case(format_name, megapixels, author, album):
+                                self.write_result(result)
+                                results.append(result)
+            finally:
+                image_field.storage = original_storage
+                StandInPrivateMediaStorage.stand_in_bucket = None
+                transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump({"repeat": self.repeat, "storage": options["storage"], "results": results}, file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
@@ -0,0 +1,61 @@
+import timeit
+
+from accounts.models import User
+from album.models import Album, Image
+from album.serializers import AlbumListSerializer, ImageSerializer
+from core.renderers import CamelCaseJSONRenderer
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+def get_album_payload(images_count, child_albums_count):
+    """
+    Album detail response data, built from unsaved instances so no database is needed.
+    """
+    request = Request(APIRequestFactory().get("/"))
+    now = timezone.now()
+    creator = User(id=1, email="creator@example.com", first_name="First", last_name="Last", is_vendor=True)
+    album = Album(id=1, name="Album", creator=creator, is_public=True, created=now)
+    images = [
+        Image(id=i, album=album, author=creator, title=f"Image {i}", width=1920, height=1080, created=now)
+        for i in range(images_count)
+    ]
+    child_albums = [
+        Album(id=i, name=f"Child {i}", creator=creator, parent_album=album, created=now)
+        for i in range(2, child_albums_count + 2)
+    ]
+
+    payload = AlbumListSerializer(album).data
+    payload["images"] = ImageSerializer(images, many=True, context={"request": request}).data
+    payload["child_albums"] = AlbumListSerializer(child_albums, many=True).data
+    payload["allowed_users"] = None
+    payload["parent_album"] = None
+    return payload
+
+
+class Command(BaseCommand):
+    help = "Compares rendering of a large album detail payload by the library and the project camelCase renderers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=500, help="Number of images in the album.")
+        parser.add_argument("--child-albums", type=int, default=50, help="Number of child albums in the album.")
+        parser.add_argument("--repeat", type=int, default=50, help="Number of renders timed for each renderer.")
+
+    def handle(self, *args, **options):
+        payload = get_album_payload(options["images"], options["child_albums"])
+        renderers = [
+            ("djangorestframework_camel_case", LibraryCamelCaseJSONRenderer()),
+            ("core.renderers", CamelCaseJSONRenderer()),
+        ]
+
+        outputs = [renderer.render(payload) for _, renderer in renderers]
+        if outputs[0] != outputs[1]:
+            raise CommandError("Renderers output differs.")
+        self.stdout.write(f"Payload: {len(outputs[0])} bytes, output is identical.")
+
+        for name, renderer in renderers:
+            seconds = timeit.timeit(lambda: renderer.render(payload), number=options["repeat"])
+            self.stdout.write(f"{name}: {seconds / options['repeat'] * 1000:.2f} ms per render")
@@ -0,0 +1,84 @@
+import timeit
+
+from accounts.models import Profile, User
+from accounts.serializers import ProfileListSerializer, UserBasicInfoSerializer
+from album.models import Album
+from album.serializers import AlbumListSerializer
+from core.renderers import CamelCaseJSONRenderer
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+def seed(rows_count):
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        (
+            User(email=f"benchmark_{i}@example.com", first_name=f"First{i}", last_name=f"Last{i}", password=password)
+            for i in range(rows_count)
+        ),
+        batch_size=1000,
+    )
+    albums = Album.objects.bulk_create(
+        (Album(name=f"Album {i}", creator=user) for i, user in enumerate(users)), batch_size=1000
+    )
+    Profile.objects.bulk_create(
+        (
+            Profile(name=f"Benchmark {i}", description="", owner=user, portfolio=album)
+            for i, (user, album) in enumerate(zip(users, albums))
+        ),
+        batch_size=1000,
+    )
+    return [user.pk for user in users]
+
+
+class Command(BaseCommand):
+    help = "Compares list serialization from model instances and from values() rows on generated data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of rows of every serialized list.")
+        parser.add_argument("--repeat", type=int, default=5, help="Number of serializations timed for each list.")
+
+    def get_lists(self, user_ids):
+        yield "users", UserBasicInfoSerializer, User.objects.filter(pk__in=user_ids).order_by("pk")
+        yield "albums", AlbumListSerializer, Album.objects.filter(creator__in=user_ids).order_by("pk")
+        yield "profiles", ProfileListSerializer, Profile.objects.filter(owner__in=user_ids).order_by("pk")
+
+    def get_related(self, serializer_class):
+        # Nested serializers are joined, so serializing instances does not query per row.
+        return [
+            name for name, field in serializer_class().fields.items() if isinstance(field, serializers.BaseSerializer)
+        ]
+
+    def from_instances(self, serializer_class, queryset, context):
+        instances = list(queryset.select_related(*self.get_related(serializer_class)))
+        return serializers.ListSerializer(child=serializer_class(), instance=instances, context=context).data
+
+    def from_values(self, serializer_class, queryset, context):
+        return serializer_class(queryset.all(), many=True, context=context).data
+
+    def handle(self, *args, **options):
+        context = {"request": Request(APIRequestFactory().get("/"))}
+        rows_count, repeat = options["rows"], options["repeat"]
+
+        with transaction.atomic():
+            user_ids = seed(rows_count)
+            for name, serializer_class, queryset in self.get_lists(user_ids):
+                outputs = [
+                    CamelCaseJSONRenderer().render(serialize(serializer_class, queryset, context))
+                    for serialize in [self.from_instances, self.from_values]
+                ]
+                if outputs[0] != outputs[1]:
+                    raise CommandError(f"Output of {name} differs.")
+                self.stdout.write(f"{name}: output is identical.")
+
+                for serialize in [self.from_instances, self.from_values]:
+                    seconds = timeit.timeit(lambda: serialize(serializer_class, queryset, context), number=repeat)
+                    self.stdout.write(
+                        f"  {serialize.__name__}: {seconds / repeat / rows_count * 1000000:.2f} us per row"
+                    )
+
+            transaction.set_rollback(True)
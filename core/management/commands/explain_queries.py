@@ -0,0 +1,175 @@
+import random
+import re
+from datetime import timedelta
+
+from accounts.models import Profile, User
+from album.models import Album
+from album.views import AlbumViewset
+from core.partitions import create_month_partitions
+from core.sync import filter_changed, get_oldest_running_txid
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from order.models import Note, NoteReadMarker, Order
+from order.views import NoteViewSet, OrderViewSet
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+SEQUENTIAL_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def seed(users_count, rng):
+    now = timezone.now()
+    password = make_password(None)
+
+    def created():
+        return now - timedelta(minutes=rng.randint(0, 525600))
+
+    users = User.objects.bulk_create(
+        User(
+            email=f"explain_{i}@example.com",
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            password=password,
+            is_vendor=i % 100 == 0,
+        )
+        for i in range(users_count)
+    )
+    vendors = [user for user in users if user.is_vendor]
+    portfolios = Album.objects.bulk_create(
+        Album(name="Portfolio", creator=vendor, is_public=True, created=created()) for vendor in vendors
+    )
+    Profile.objects.bulk_create(
+        Profile(name=f"Profile {vendor.id}", description="", owner=vendor, portfolio=portfolio)
+        for vendor, portfolio in zip(vendors, portfolios)
+    )
+    albums = Album.objects.bulk_create(
+        Album(name=f"Album {i}", creator=vendor, created=created()) for vendor in vendors for i in range(10)
+    )
+    Album.objects.bulk_create(
+        Album(name=f"Child {i}", creator=album.creator, parent_album=album, created=created())
+        for album in albums
+        for i in range(3)
+    )
+    orders = Order.objects.bulk_create(
+        (
+            Order(
+                description="",
+                status=rng.randint(0, 6),
+                vendor=rng.choice(vendors),
+                client=rng.choice(users),
+                created=created(),
+            )
+            for _ in range(users_count)
+        ),
+        batch_size=1000,
+    )
+    Note.objects.bulk_create(
+        (
+            Note(user=order.client, order=order, note="", created=order.created + (now - order.created) * rng.random())
+            for order in orders
+            for _ in range(2)
+        ),
+        batch_size=1000,
+    )
+    create_month_partitions(Note._meta.db_table, "created", 0)
+    NoteReadMarker.objects.bulk_create(
+        (
+            NoteReadMarker(order=order, user_id=user_id, unread=2 if user_id == order.vendor_id else 0)
+            for order in orders
+            for user_id in {order.vendor_id, order.client_id}
+        ),
+        batch_size=1000,
+    )
+    return vendors[0]
+
+
+def get_list_queryset(viewset, user, **kwargs):
+    request = Request(APIRequestFactory().get("/"))
+    request.user = user
+    view = viewset(request=request, action="list", kwargs=kwargs, format_kwarg=None)
+    queryset = view.filter_queryset(view.get_queryset())
+    return view, queryset
+
+
+def get_sequential_scans(plan):
+    """
+    Returns the tables scanned sequentially in `plan`, except empty ones, e.g. partitions of the coming months,
+    which are always scanned sequentially. Tables must be analyzed first.
+    """
+    tables = SEQUENTIAL_SCAN.findall(plan)
+    if not tables:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relname FROM pg_class WHERE relname = ANY(%s) AND reltuples = 0", [tables])
+        empty = {row[0] for row in cursor.fetchall()}
+    return [table for table in tables if table not in empty]
+
+
+class Command(BaseCommand):
+    help = "Runs EXPLAIN for the hot viewset queries and fails if any of them plans a sequential scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="Explain against a generated dataset which is rolled back afterwards.",
+        )
+        parser.add_argument("--users", type=int, default=20000, help="Number of users generated with --seed.")
+        parser.add_argument("--random-seed", type=int, default=0, help="Seed of the data generated with --seed.")
+        parser.add_argument(
+            "--disable-seqscan",
+            action="store_true",
+            help="Plan with enable_seqscan off, for datasets too small for the planner to prefer indexes. "
+            "A sequential scan is then only planned when no index fits the query.",
+        )
+        parser.add_argument("--user", type=int, help="Id of the user the queries are run for.")
+
+    def get_querysets(self, user):
+        view, queryset = get_list_queryset(OrderViewSet, user)
+        yield "order-list", queryset[: view.paginator.page_size]
+
+        # Steady state polling, nothing changed since the cursor.
+        cursor = (get_oldest_running_txid(), 0)
+        yield "order-sync", filter_changed(view.get_queryset().select_related(None), cursor, cursor[0])
+
+        view, queryset = get_list_queryset(AlbumViewset, user)
+        yield "album-list", queryset[: view.paginator.page_size]
+
+        order = Order.objects.filter(vendor=user).first()
+        if order is not None:
+            view, _ = get_list_queryset(NoteViewSet, user, order_pk=order.pk)
+            yield "order-notes-list", view.get_note_queryset(order)[: view.paginator.page_size]
+            yield "order-notes-sync", filter_changed(view.get_note_queryset(order), cursor, cursor[0])
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if options["seed"]:
+                user = seed(options["users"], random.Random(options["random_seed"]))
+            elif options["user"]:
+                user = User.objects.get(pk=options["user"])
+            else:
+                user = User.objects.filter(is_vendor=True).first()
+                if user is None:
+                    raise CommandError("There is no vendor to run the queries for, use --seed or --user.")
+
+            tables = ", ".join(model._meta.db_table for model in [User, Profile, Album, Order, Note, NoteReadMarker])
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {tables}")
+                if options["disable_seqscan"]:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, queryset in self.get_querysets(user):
+                plan = queryset.explain()
+                self.stdout.write(f"{name}\n{plan}\n")
+                if get_sequential_scans(plan):
+                    failures.append(name)
+
+            if options["seed"]:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Sequential scan planned for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("No sequential scans planned."))
@@ -0,0 +1,292 @@
+import os
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO
+from itertools import islice
+
+from accounts.models import Profile, User
+from album.models import Album, Image
+from core.partitions import create_month_partitions
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from order.models import Note, NoteReadMarker, Order
+from PIL import Image as PILImage
+
+# Rows at --scale 1.
+USERS = 20000
+IMAGES = 1000000
+ORDERS = 50000
+
+VENDORS_RATIO = 20
+ALBUMS_PER_VENDOR = 10
+CHILD_ALBUMS = 3
+MAX_ALLOWED_USERS = 5
+MAX_NOTES = 8
+PUBLIC_ALBUMS_RATIO = 0.3
+
+
+def bulk_create(model, objs, batch_size):
+    """
+    `bulk_create` of a generator in batches, so only one batch of instances is held in memory at a time.
+    Returns the number of created rows.
+    """
+    count = 0
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return count
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        count += len(batch)
+
+
+def generate_image(size, rng):
+    file = BytesIO()
+    image = PILImage.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    for _ in range(8):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image.paste(color, (x, y, min(x + size[0] // 4, size[0]), min(y + size[1] // 4, size[1])))
+    image.save(file, "JPEG", quality=85)
+    return file.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a large dataset of users, vendor profiles, nested albums with images, shared access lists "
+        "and orders with notes in all statuses, with bulk_create. Image files are written to a local directory, "
+        "or uploaded to the storage of images with --upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help=f"Multiplies the generated rows, 1 creates {USERS} users, {IMAGES} images and {ORDERS} orders.",
+        )
+        parser.add_argument("--prefix", default="seed", help="Prefix of the generated emails and profile names.")
+        parser.add_argument("--password", default="password", help="Password of every generated user.")
+        parser.add_argument("--files", type=int, default=100, help="Number of distinct image files, 0 for none.")
+        parser.add_argument("--image-width", type=int, default=1024)
+        parser.add_argument("--image-height", type=int, default=768)
+        parser.add_argument(
+            "--media-dir",
+            default=settings.MEDIA_ROOT,
+            help="Local directory the image files are written to, in the layout of the media storage.",
+        )
+        parser.add_argument(
+            "--upload",
+            action="store_true",
+            help="Uploads the image files to the storage of images, the private S3 bucket, instead of --media-dir.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def step(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.stdout.write(f"{name}: {time.perf_counter() - start:.1f} s")
+        return result
+
+    def created(self):
+        return self.now - timedelta(minutes=self.rng.randint(0, 525600))
+
+    def write_files(self, count, size):
+        # Images share a pool of files, generating a file per image would take longer than the rest of the seeding.
+        if self.upload:
+            storage = Image._meta.get_field("image").storage
+        else:
+            storage = FileSystemStorage(location=os.path.join(self.media_dir, settings.AWS_PRIVATE_MEDIA_LOCATION))
+        names = []
+        for i in range(count):
+            name = f"{self.prefix}/image_{i}.jpg"
+            if not storage.exists(name):
+                storage.save(name, ContentFile(generate_image(size, self.rng)))
+            names.append(name)
+        return names
+
+    def create_users(self, users_count, vendors_count):
+        password = make_password(self.password)
+        users = User.objects.bulk_create(
+            (
+                User(
+                    email=f"{self.prefix}_{i}@example.com",
+                    first_name=f"First{i}",
+                    last_name=f"Last{i}",
+                    password=password,
+                    is_vendor=i < vendors_count,
+                    join_date=self.created(),
+                )
+                for i in range(users_count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return users[:vendors_count], users
+
+    def create_profiles(self, vendors):
+        portfolios = Album.objects.bulk_create(
+            (Album(name="Portfolio", creator=vendor, is_public=True, created=self.created()) for vendor in vendors),
+            batch_size=self.batch_size,
+        )
+        Profile.objects.bulk_create(
+            (
+                Profile(
+                    name=f"{self.prefix} vendor {i}",
+                    description=f"Photographer number {i}, weddings, portraits and landscapes.",
+                    owner=vendor,
+                    portfolio=portfolio,
+                    created=self.created(),
+                )
+                for i, (vendor, portfolio) in enumerate(zip(vendors, portfolios))
+            ),
+            batch_size=self.batch_size,
+        )
+        Profile.objects.filter(owner__in=vendors).update_search_vector()
+        return portfolios
+
+    def create_albums(self, vendors, portfolios):
+        roots = Album.objects.bulk_create(
+            (
+                Album(
+                    name=f"Album {i}",
+                    creator=vendor,
+                    is_public=self.rng.random() < PUBLIC_ALBUMS_RATIO,
+                    created=self.created(),
+                )
+                for vendor in vendors
+                for i in range(ALBUMS_PER_VENDOR)
+            ),
+            batch_size=self.batch_size,
+        )
+        children = Album.objects.bulk_create(
+            (
+                Album(name=f"{album.name}.{i}", creator=album.creator, parent_album=album, created=self.created())
+                for album in roots + portfolios
+                for i in range(CHILD_ALBUMS)
+            ),
+            batch_size=self.batch_size,
+        )
+        albums = portfolios + roots + children
+        Album.objects.filter(pk__in=[album.pk for album in albums]).update_search_vector()
+        return albums
+
+    def create_access(self, albums, users):
+        through = Album.allowed_users.through
+        return bulk_create(
+            through,
+            (
+                through(album_id=album.pk, user_id=user.pk)
+                for album in albums
+                if not album.is_public
+                for user in self.rng.sample(users, min(self.rng.randint(0, MAX_ALLOWED_USERS), len(users)))
+            ),
+            self.batch_size,
+        )
+
+    def create_images(self, albums, images_count, file_names, size):
+        return bulk_create(
+            Image,
+            (
+                Image(
+                    album=album,
+                    author_id=album.creator_id,
+                    image=file_names[i % len(file_names)] if file_names else f"{self.prefix}/missing_{i}.jpg",
+                    title=f"Image {i}",
+                    width=size[0],
+                    height=size[1],
+                    created=self.created(),
+                )
+                for i, album in ((i, albums[i % len(albums)]) for i in range(images_count))
+            ),
+            self.batch_size,
+        )
+
+    def create_orders(self, orders_count, vendors, users):
+        currencies = [currency for currency, _ in Order.CURRENCIES]
+        statuses = [status for status, _ in Order.STATUSES]
+        orders = []
+        for i in range(orders_count):
+            vendor = vendors[i % len(vendors)]
+            # Every status is generated, also at the smallest scales.
+            status = statuses[i % len(statuses)]
+            orders.append(
+                Order(
+                    description=f"Order {i}",
+                    status=status,
+                    cost=round(self.rng.uniform(100, 5000), 2) if status >= 3 else None,
+                    currency=self.rng.choice(currencies),
+                    vendor=vendor,
+                    client=self.rng.choice([user for user in self.rng.sample(users, 2) if user != vendor]),
+                    created=self.created(),
+                )
+            )
+        orders = Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        Order.objects.filter(pk__in=[order.pk for order in orders]).update_search_vector()
+        return orders
+
+    def generate_notes(self, orders, unread):
+        for order in orders:
+            for _ in range(self.rng.randint(0, MAX_NOTES)):
+                user_id = self.rng.choice([order.vendor_id, order.client_id])
+                other_id = order.client_id if user_id == order.vendor_id else order.vendor_id
+                unread[order.pk, other_id] += 1
+                created = order.created + (self.now - order.created) * self.rng.random()
+                yield Note(order=order, user_id=user_id, note=f"Note of user {user_id}.", created=created)
+
+    def create_notes(self, orders):
+        unread = Counter()
+        count = bulk_create(Note, self.generate_notes(orders, unread), self.batch_size)
+        # Notes land in the default partition unless their month partition exists, this moves them out of it.
+        create_month_partitions(Note._meta.db_table, "created", 0)
+        bulk_create(
+            NoteReadMarker,
+            (
+                NoteReadMarker(order=order, user_id=user_id, unread=unread[order.pk, user_id])
+                for order in orders
+                for user_id in {order.vendor_id, order.client_id}
+            ),
+            self.batch_size,
+        )
+        return count
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        self.rng = random.Random(options["random_seed"])
+        self.now = timezone.now()
+        self.prefix, self.password = options["prefix"], options["password"]
+        self.media_dir, self.upload, self.batch_size = options["media_dir"], options["upload"], options["batch_size"]
+        size = (options["image_width"], options["image_height"])
+
+        users_count = max(int(USERS * scale), 2)
+        vendors_count = max(users_count // VENDORS_RATIO, 1)
+        if User.objects.filter(email__startswith=f"{self.prefix}_").exists():
+            raise CommandError(f"Users with the prefix {self.prefix} already exist, use another --prefix.")
+
+        file_names = self.step("files", self.write_files, options["files"], size)
+        with transaction.atomic():
+            vendors, users = self.step("users", self.create_users, users_count, vendors_count)
+            portfolios = self.step("profiles", self.create_profiles, vendors)
+            albums = self.step("albums", self.create_albums, vendors, portfolios)
+            access_count = self.step("access", self.create_access, albums, users)
+            images_count = self.step(
+                "images", self.create_images, albums, max(int(IMAGES * scale), 1), file_names, size
+            )
+            orders = self.step("orders", self.create_orders, max(int(ORDERS * scale), 1), vendors, users)
+            notes_count = self.step("notes", self.create_notes, orders)
+            self.step("order stats", call_command, "rebuild_order_stats", stdout=self.stdout)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(users)} users, {len(vendors)} vendors, {len(albums)} albums, {access_count} access "
+                f"rows, {images_count} images, {len(orders)} orders and {notes_count} notes."
+            )
+        )
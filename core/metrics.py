@@ -0,0 +1,97 @@
+import hmac
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Workers write their values to files in PROMETHEUS_MULTIPROC_DIR when it is set, see gunicorn.conf.py.
+requests_total = Counter("http_requests_total", "Requests by route.", ["route", "method", "status"])
+request_duration = Histogram("http_request_duration_seconds", "Request latency by route.", ["route", "method"])
+request_queries = Histogram(
+    "http_request_db_queries",
+    "Database queries per request by route.",
+    ["route"],
+    buckets=[0, 1, 2, 3, 5, 10, 20, 50, 100, 200],
+)
+storage_call_duration = Histogram(
+    "storage_call_duration_seconds", "Latency of media storage calls.", ["storage", "operation"]
+)
+thumbnail_generation_duration = Histogram(
+    "thumbnail_generation_duration_seconds",
+    "Duration of generating image thumbnails.",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+cache_requests_total = Counter("cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"])
+
+
+def get_route(request):
+    # Route names, e.g. album-images-thumbnail, instead of paths, so the number of series stays fixed.
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "unmatched"
+    return resolver_match.url_name or resolver_match.view_name
+
+
+def observe_request(route, method, status, duration, queries=None):
+    requests_total.labels(route, method, status).inc()
+    request_duration.labels(route, method).observe(duration)
+    if queries is not None:
+        request_queries.labels(route).observe(queries)
+
+
+def observe_storage_call(storage, operation, duration):
+    storage_call_duration.labels(storage, operation.lstrip("_")).observe(duration)
+
+
+def observe_cache(cache, hit):
+    cache_requests_total.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observed_asgi_view(route, view):
+    """
+    Wraps an async view served outside of Django's request cycle, so its requests are counted too.
+    """
+
+    async def wrapper(scope, receive, send, **kwargs):
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            return await view(scope, receive, send_wrapper, **kwargs)
+        finally:
+            observe_request(route, scope["method"], status, time.perf_counter() - start)
+
+    return wrapper
+
+
+def get_registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Metrics of all workers in the Prometheus text format, behind `Authorization: Bearer <METRICS_TOKEN>`.
+    Without the token they are only exposed in DEBUG.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    else:
+        # Constant-time comparison, compared as bytes since headers may hold any latin-1 characters.
+        authorization = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return HttpResponse(status=401)
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,111 @@
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case.util import camel_to_underscore
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, FormParser, JSONParser, MultiPartParser
+
+from .renderers import camelize_key
+
+key_maps = {}
+
+
+@lru_cache(maxsize=4096)
+def underscore_key(key):
+    return camel_to_underscore(key, **camel_case_settings.JSON_UNDERSCOREIZE)
+
+
+def build_key_map(serializer):
+    """
+    Maps camelCase keys of the fields declared by `serializer` to their names,
+    with the key map of the nested serializer, if the field is one.
+    """
+    key_map = {}
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        nested = build_key_map(field) if isinstance(field, serializers.Serializer) else None
+        key_map[camelize_key(name)] = (name, nested)
+    return key_map
+
+
+def get_key_map(parser_context):
+    """
+    Key map of the serializer the view validates the request with,
+    None if the view has no serializer, then every key is converted.
+    """
+    view = (parser_context or {}).get("view")
+    if not hasattr(view, "get_serializer_class"):
+        return None
+    try:
+        serializer_class = view.get_serializer_class()
+    except AssertionError:
+        # Generic views without serializer_class.
+        return None
+    if serializer_class not in key_maps:
+        key_maps[serializer_class] = build_key_map(serializer_class(context=view.get_serializer_context()))
+    return key_maps[serializer_class]
+
+
+def underscoreize(data, key_map):
+    """
+    Converts keys the same way as `djangorestframework_camel_case.util.underscoreize`.
+    With a key map only the declared fields are renamed, keys unknown to the serializer and values of
+    non-serializer fields are left as they are, the serializer ignores them anyway.
+    """
+    if isinstance(data, MultiValueDict):
+        new_data = QueryDict(mutable=True) if isinstance(data, QueryDict) else MultiValueDict()
+        for key, values in data.lists():
+            new_data.setlist(underscoreize_key(key, key_map)[0], values)
+        return new_data
+    if isinstance(data, dict):
+        new_dict = {}
+        ignore_fields = camel_case_settings.JSON_UNDERSCOREIZE.get("ignore_fields") or ()
+        for key, value in data.items():
+            new_key, nested = underscoreize_key(key, key_map)
+            if key in ignore_fields or new_key in ignore_fields:
+                new_dict[new_key] = value
+            elif key_map is None or nested is not None:
+                new_dict[new_key] = underscoreize(value, nested)
+            else:
+                new_dict[new_key] = value
+        return new_dict
+    if isinstance(data, list):
+        return [underscoreize(item, key_map) for item in data]
+    return data
+
+
+def underscoreize_key(key, key_map):
+    if key_map is None:
+        return (underscore_key(key) if isinstance(key, str) else key), None
+    return key_map.get(key, (key, None))
+
+
+class CamelCaseJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = json.loads(stream.read().decode(encoding))
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+        return underscoreize(data, get_key_map(parser_context))
+
+
+class CamelCaseFormParser(FormParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        data = super().parse(stream, media_type, parser_context)
+        return underscoreize(data, get_key_map(parser_context)) if data else data
+
+
+class CamelCaseMultiPartParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        data_and_files = super().parse(stream, media_type, parser_context)
+        key_map = get_key_map(parser_context)
+        data = underscoreize(data_and_files.data, key_map) if data_and_files.data else data_and_files.data
+        return DataAndFiles(data, underscoreize(data_and_files.files, key_map))
@@ -0,0 +1,121 @@
+import re
+from datetime import date
+
+from django.db import connection
+from django.utils import timezone
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+def get_month_partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def get_default_partition(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT partdefid::regclass::text FROM pg_partitioned_table WHERE partrelid = %s::regclass", [table]
+        )
+        return cursor.fetchone()[0]
+
+
+def get_partitions(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_default_partition_months(table, column):
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT DISTINCT date_trunc('month', "{column}" AT TIME ZONE 'UTC')::date
+            FROM "{get_default_partition(table)}"
+            """)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(table, name, bounds, condition, params):
+    """
+    Creates and attaches the partition `name` of `table` for `bounds`, moving the rows matching `condition` out of
+    the default partition first, attaching a partition which overlaps rows in the default partition would fail.
+    Rows are moved in one statement, the default partition stays locked until the transaction ends.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f"""
+            WITH moved AS (DELETE FROM "{get_default_partition(table)}" WHERE {condition} RETURNING *)
+            INSERT INTO "{name}" SELECT * FROM moved
+            """,
+            params,
+        )
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {bounds}', params)
+    return name
+
+
+def create_month_partition(table, column, month):
+    start, end = [f"{bound:%Y-%m-%d} 00:00:00+00" for bound in (month, add_months(month, 1))]
+    return create_partition(
+        table,
+        get_month_partition_name(table, month),
+        "FOR VALUES FROM (%s) TO (%s)",
+        f'"{column}" >= %s AND "{column}" < %s',
+        [start, end],
+    )
+
+
+def create_month_partitions(table, column, months_ahead):
+    """
+    Creates partitions from the current month to `months_ahead` months later,
+    and for every month of rows which landed in the default partition.
+    """
+    current_month = month_start(timezone.now())
+    months = {add_months(current_month, months) for months in range(months_ahead + 1)}
+    months.update(get_default_partition_months(table, column))
+
+    existing = set(get_partitions(table))
+    return [
+        create_month_partition(table, column, month)
+        for month in sorted(months)
+        if get_month_partition_name(table, month) not in existing
+    ]
+
+
+def detach_month_partitions(table, keep_months):
+    """
+    Detaches partitions of months older than `keep_months` months before the current one.
+    Detached partitions stay in the database as standalone tables without foreign keys and are no longer read
+    by queries on `table`.
+    """
+    oldest_kept = get_month_partition_name(table, add_months(month_start(timezone.now()), -keep_months))
+    pattern = re.compile(rf"{re.escape(table)}_p\d{{4}}_\d{{2}}")
+    detached = []
+    with connection.cursor() as cursor:
+        for name in get_partitions(table):
+            # Names sort by month, the default and other partitions are never detached.
+            if pattern.fullmatch(name) and name < oldest_kept:
+                cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                # Detached tables are a cold archive, their foreign keys would block deleting the rows they reference.
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [name]
+                )
+                for (constraint,) in cursor.fetchall():
+                    cursor.execute(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"')
+                detached.append(name)
+    return detached
@@ -0,0 +1,197 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import exceptions
+
+from .asgi_utils import authenticate
+from .instrumentation import current_metrics
+from .metrics import get_route
+
+PROFILE_PARAM = "profile"
+MAX_STACK_DEPTH = 100
+MAX_STACKS = 200
+SLOW_REQUEST_ID = re.compile(r"^\d+-\d+$")
+
+
+def get_stack(frame):
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{code.co_name}")
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class StackSampler:
+    """
+    Samples the stacks of the registered threads every `interval` seconds, from a single daemon thread,
+    so requests are profiled at a fixed cost whatever their number of calls.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, thread_id):
+        samples = Counter()
+        with self.lock:
+            self.samples[thread_id] = samples
+            # Threads do not survive forking into workers.
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+                self.thread.start()
+        return samples
+
+    def stop(self, thread_id):
+        with self.lock:
+            return self.samples.pop(thread_id, Counter())
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.samples:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self.samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[get_stack(frame)] += 1
+
+
+sampler = None
+
+
+def get_sampler():
+    global sampler
+    if sampler is None:
+        sampler = StackSampler(settings.SLOW_REQUEST_SAMPLE_INTERVAL)
+    return sampler
+
+
+def save_slow_request(record):
+    """
+    Saves `record` to the ring buffer of the last `SLOW_REQUEST_LIMIT` slow requests, files in `SLOW_REQUEST_DIR`
+    shared by the workers of the host.
+    """
+    os.makedirs(settings.SLOW_REQUEST_DIR, exist_ok=True)
+    record["id"] = f"{time.time_ns()}-{os.getpid()}"
+    with open(os.path.join(settings.SLOW_REQUEST_DIR, f"{record['id']}.json"), "w") as file:
+        json.dump(record, file, default=str)
+
+    for name in get_slow_request_names()[settings.SLOW_REQUEST_LIMIT :]:
+        try:
+            os.remove(os.path.join(settings.SLOW_REQUEST_DIR, name))
+        except FileNotFoundError:
+            # Removed by another worker.
+            pass
+    return record["id"]
+
+
+def get_slow_request_names():
+    try:
+        names = [name for name in os.listdir(settings.SLOW_REQUEST_DIR) if name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    # Newest first, ids start with the time in nanoseconds.
+    return sorted(names, key=lambda name: int(name.split("-")[0]), reverse=True)
+
+
+def get_slow_request(pk):
+    if not SLOW_REQUEST_ID.match(str(pk)):
+        return None
+    try:
+        with open(os.path.join(settings.SLOW_REQUEST_DIR, f"{pk}.json")) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def get_slow_requests():
+    records = (get_slow_request(name[: -len(".json")]) for name in get_slow_request_names())
+    return [record for record in records if record is not None]
+
+
+def get_slow_request_record(request, response, metrics, duration, samples):
+    return {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "route": get_route(request),
+        "status": response.status_code,
+        "created": timezone.now().isoformat(),
+        "duration_ms": round(duration * 1000, 1),
+        "queries": [{"sql": sql, "duration_ms": round(seconds * 1000, 2)} for sql, seconds in metrics.db.calls],
+        "queries_count": metrics.db.count,
+        "storage_calls": [
+            {"operation": operation, "name": name, "duration_ms": round(seconds * 1000, 2)}
+            for (operation, name), seconds in metrics.storage.calls
+        ],
+        "storage_calls_count": metrics.storage.count,
+        "sample_interval_ms": settings.SLOW_REQUEST_SAMPLE_INTERVAL * 1000,
+        # Collapsed stacks, as read by flame graph tools.
+        "profile": [{"stack": ";".join(stack), "samples": count} for stack, count in samples.most_common(MAX_STACKS)],
+    }
+
+
+def is_profile_requested(request):
+    if request.GET.get(PROFILE_PARAM) != "1":
+        return False
+    try:
+        return authenticate(request).is_staff
+    except exceptions.APIException:
+        return False
+
+
+def get_profile_response(profiler, response):
+    stream = io.StringIO()
+    stream.write(f"{response.status_code} {response.reason_phrase}\n")
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(MAX_STACKS)
+    return HttpResponse(stream.getvalue(), content_type="text/plain; charset=utf-8")
+
+
+class SlowRequestMiddleware:
+    """
+    Saves the queries, storage calls and sampled stacks of requests slower than `SLOW_REQUEST_THRESHOLD_MS`,
+    which staff browse at /slow-requests/. Staff users get the profile of a request instead of its response
+    with `?profile=1`. Must come after `ServerTimingMiddleware`, which records the calls.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if is_profile_requested(request):
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+            return get_profile_response(profiler, response)
+
+        metrics = current_metrics.get()
+        if settings.SLOW_REQUEST_THRESHOLD_MS is None or metrics is None:
+            return self.get_response(request)
+
+        metrics.record_calls = True
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        get_sampler().start(thread_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            samples = get_sampler().stop(thread_id)
+
+        duration = time.perf_counter() - start
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            save_slow_request(get_slow_request_record(request, response, metrics, duration, samples))
+        return response
@@ -0,0 +1,63 @@
+import re
+from functools import lru_cache
+
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case.util import camelize_re, underscore_to_camel
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=4096)
+def camelize_key(key):
+    # Keys are field names of a handful of serializers, so after the first responses every lookup hits the cache.
+    if "_" not in key:
+        return key
+    return re.sub(camelize_re, underscore_to_camel, key)
+
+
+def camelize(data, ignore_fields=()):
+    """
+    Same output as `djangorestframework_camel_case.util.camelize` without its per key regex
+    and per value `isinstance` chain, values of the common JSON types are returned as they are.
+    """
+    if isinstance(data, SCALAR_TYPES):
+        return data
+    if isinstance(data, dict):
+        # The browsable API reads the serializer of the rendered data.
+        new_dict = ReturnDict(serializer=data.serializer) if isinstance(data, ReturnDict) else {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            new_key = camelize_key(key) if isinstance(key, str) else key
+            if ignore_fields and (key in ignore_fields or new_key in ignore_fields):
+                new_dict[new_key] = value
+            else:
+                new_dict[new_key] = camelize(value, ignore_fields)
+        return new_dict
+    if isinstance(data, (list, tuple)):
+        return [camelize(item, ignore_fields) for item in data]
+    if isinstance(data, Promise):
+        return force_str(data)
+    try:
+        items = iter(data)
+    except TypeError:
+        return data
+    return [camelize(item, ignore_fields) for item in items]
+
+
+def get_ignore_fields():
+    return camel_case_settings.JSON_UNDERSCOREIZE.get("ignore_fields") or ()
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    def render(self, data, *args, **kwargs):
+        return super().render(camelize(data, get_ignore_fields()), *args, **kwargs)
+
+
+class CamelCaseBrowsableAPIRenderer(BrowsableAPIRenderer):
+    def render(self, data, *args, **kwargs):
+        return super().render(camelize(data, get_ignore_fields()), *args, **kwargs)
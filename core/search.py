@@ -0,0 +1,70 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import models
+from django.db.models import F, OuterRef, Subquery
+from rest_framework.settings import api_settings
+
+from core.utils import SwaggerSearchFilter
+
+SEARCH_CONFIG = "simple"
+
+
+def build_search_vector(model, fields):
+    # Fields spanning relations are read through subqueries, because UPDATE cannot join.
+    expressions = []
+    for field in fields:
+        name, _, path = field.partition("__")
+        if path:
+            related_model = model._meta.get_field(name).related_model
+            related = related_model._default_manager.filter(pk=OuterRef(name)).values(path)[:1]
+            expressions.append(Subquery(related))
+        else:
+            expressions.append(F(name))
+    return SearchVector(*expressions, config=SEARCH_CONFIG)
+
+
+class SearchVectorQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        return self.update(search_vector=build_search_vector(self.model, self.model.search_vector_fields))
+
+
+def search_vector_outdated(created, update_fields, fields):
+    if created or update_fields is None:
+        return True
+    names = {field.split("__")[0] for field in fields}
+    return bool(names.intersection(update_fields))
+
+
+class FullTextSearchFilter(SwaggerSearchFilter):
+    """
+    Search backed by the model's maintained `search_vector` column.
+    Falls back to `icontains` lookups when the view searches fields the vector does not cover.
+    """
+
+    def get_search_query(self, search_terms):
+        words = []
+        for term in search_terms:
+            words.extend(re.sub(r"[&|!():*<>'\\]", " ", term).split())
+        if not words:
+            return None
+        return SearchQuery(" & ".join(f"{word}:*" for word in words), config=SEARCH_CONFIG, search_type="raw")
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        vector_fields = getattr(queryset.model, "search_vector_fields", None)
+
+        if not search_fields or not search_terms:
+            return queryset
+        if not vector_fields or not set(search_fields).issubset(vector_fields):
+            return super().filter_queryset(request, queryset, view)
+
+        query = self.get_search_query(search_terms)
+        if query is None:
+            return queryset
+        queryset = queryset.filter(search_vector=query)
+
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+        return queryset.annotate(search_rank=SearchRank(F("search_vector"), query)).order_by("-search_rank", "pk")
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -77,6 +78,7 @@ INSTALLED_APPS = [
     "accounts",
     "order",
     "album",
+    "core",
     "django_filters",
     "django_sendfile",
     "drf_yasg",
@@ -85,6 +87,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.ServerTimingMiddleware",
+    "core.profiling.SlowRequestMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -199,16 +203,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
+        "accounts.authentication.CachedJWTCookieAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
-        "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
+        "core.renderers.CamelCaseJSONRenderer",
+        "core.renderers.CamelCaseBrowsableAPIRenderer",
     ),
     "DEFAULT_PARSER_CLASSES": (
-        "djangorestframework_camel_case.parser.CamelCaseFormParser",
-        "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
-        "djangorestframework_camel_case.parser.CamelCaseJSONParser",
+        "core.parsers.CamelCaseFormParser",
+        "core.parsers.CamelCaseMultiPartParser",
+        "core.parsers.CamelCaseJSONParser",
     ),
     "JSON_UNDERSCOREIZE": {
         "no_underscore_before_number": True,
@@ -266,6 +270,8 @@ REST_SESSION_LOGIN = False
 REST_USE_JWT = True
 JWT_AUTH_COOKIE = "access-token"
 JWT_AUTH_REFRESH_COOKIE = "refresh-token"
+# Seconds authenticated users are cached for, see accounts.authentication.
+JWT_USER_CACHE_TIMEOUT = 60
 SITE_ID = 3
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -286,6 +292,32 @@ PRIVATE_FILE_STORAGE = "core.storage_backends.PrivateMediaStorage"
 
 IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = "imagekit.cachefiles.strategies.Optimistic"
 IMAGEKIT_DEFAULT_FILE_STORAGE = "core.storage_backends.PrivateMediaStorage"
+IMAGEKIT_DEFAULT_CACHEFILE_BACKEND = "core.cachefiles.InstrumentedCachefileBackend"
 IMAGEKIT_CACHEFILE_DIR = ""
 
+# In-process broker for order note streams, replace with a shared one when running several ASGI workers.
+BROKER_BACKEND = "core.broker.LocalBroker"
+
+# Sends the Server-Timing header of ServerTimingMiddleware to every user, not only to staff users and in DEBUG.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Bearer token required by the /metrics endpoint, which is only exposed in DEBUG when not set.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Requests slower than this are saved with their queries and sampled stacks, see core.profiling.
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 1000))
+SLOW_REQUEST_SAMPLE_INTERVAL = 0.005
+SLOW_REQUEST_LIMIT = 100
+SLOW_REQUEST_DIR = os.path.join(tempfile.gettempdir(), "slow_requests")
+
+# Album details with at least this many images stream them from the database instead of rendering them at once.
+ALBUM_STREAMING_MIN_IMAGES = 500
+
 django_heroku.settings(locals())
+
+# Request lines with their query and storage call counts are logged at DEBUG level, see core.instrumentation.
+LOGGING["loggers"]["core.instrumentation"] = {
+    "handlers": ["console"],
+    "level": os.getenv("REQUEST_LOG_LEVEL", "INFO"),
+    "propagate": False,
+}
@@ -5,19 +5,21 @@ from tempfile import SpooledTemporaryFile
 from django.conf import settings
 from storages.backends.s3boto3 import S3Boto3Storage
 
+from .instrumentation import InstrumentedStorageMixin
+
 
 class StaticStorage(S3Boto3Storage):
     location = settings.AWS_STATIC_LOCATION
 
 
-class PublicMediaStorage(S3Boto3Storage):
+class PublicMediaStorage(InstrumentedStorageMixin, S3Boto3Storage):
     location = settings.AWS_PUBLIC_MEDIA_LOCATION
     querystring_auth = False
     default_acl = "public-read"
     file_overwrite = False
 
 
-class PrivateMediaStorage(S3Boto3Storage, ABC):
+class PrivateMediaStorage(InstrumentedStorageMixin, S3Boto3Storage, ABC):
     location = settings.AWS_PRIVATE_MEDIA_LOCATION
     default_acl = "private"
     file_overwrite = False
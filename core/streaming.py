@@ -0,0 +1,122 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import CamelCaseJSONRenderer, camelize_key, get_ignore_fields
+
+
+class StreamingList:
+    """
+    List of a response which is serialized while the response is sent, from the queryset read in chunks,
+    so only one chunk of instances and one serialized item are held in memory at a time.
+    """
+
+    def __init__(self, queryset, serializer, chunk_size=200):
+        self.queryset = queryset
+        self.serializer = serializer
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        for instance in self.queryset.iterator(chunk_size=self.chunk_size):
+            yield self.serializer.to_representation(instance)
+
+
+def has_streaming_list(data):
+    return any(
+        isinstance(value, StreamingList) or isinstance(value, dict) and has_streaming_list(value)
+        for value in data.values()
+    )
+
+
+class StreamingCamelCaseJSONRenderer(CamelCaseJSONRenderer):
+    """
+    Renders data with `StreamingList` values as an iterator of bytes, with the same output as `CamelCaseJSONRenderer`
+    for the data with lists in their place. Only compact, not indented, output is streamed.
+    """
+
+    def encode(self, data, camelize=True):
+        # render() outputs nothing for None, which is only right for the whole response.
+        if data is None:
+            return b"null"
+        if camelize:
+            return self.render(data)
+        return JSONRenderer.render(self, data)
+
+    def iter_render(self, data, camelize=True):
+        if isinstance(data, StreamingList):
+            yield b"["
+            for index, item in enumerate(data):
+                if index:
+                    yield b","
+                yield self.encode(item, camelize)
+            yield b"]"
+        elif isinstance(data, dict) and has_streaming_list(data):
+            ignore_fields = get_ignore_fields() if camelize else ()
+            yield b"{"
+            for index, (key, value) in enumerate(data.items()):
+                new_key = camelize_key(key) if camelize else key
+                if index:
+                    yield b","
+                yield self.encode(new_key, camelize=False) + b":"
+                yield from self.iter_render(
+                    value, camelize and key not in ignore_fields and new_key not in ignore_fields
+                )
+            yield b"}"
+        else:
+            yield self.encode(data, camelize)
+
+
+def can_stream(request):
+    renderer = getattr(request, "accepted_renderer", None)
+    if not isinstance(renderer, JSONRenderer):
+        return False
+    return renderer.get_indent(request.accepted_media_type, {}) is None
+
+
+def get_streaming_response(data):
+    renderer = StreamingCamelCaseJSONRenderer()
+    return StreamingHttpResponse(renderer.iter_render(data), content_type=renderer.media_type)
+
+
+def read_parts(parts, size):
+    """
+    Joins the next parts of a streaming response until they reach `size` bytes, empty bytes when none are left.
+    """
+    batch = []
+    length = 0
+    for part in parts:
+        batch.append(part)
+        length += len(part)
+        if length >= size:
+            break
+    return b"".join(batch)
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    Django 3.2 iterates streaming responses in the event loop, where the database cannot be used,
+    this handler reads the parts in the thread of the sync views instead, about `batch_size` bytes per switch.
+    """
+
+    batch_size = 64 * 1024
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        response_headers = [(header.encode("ascii"), value.encode("latin1")) for header, value in response.items()]
+        for cookie in response.cookies.values():
+            response_headers.append((b"Set-Cookie", cookie.output(header="").encode("ascii").strip()))
+        await send({"type": "http.response.start", "status": response.status_code, "headers": response_headers})
+
+        parts = iter(response)
+        get_parts = sync_to_async(read_parts, thread_sensitive=True)
+        while True:
+            body = await get_parts(parts, self.batch_size)
+            if not body:
+                break
+            for chunk, _ in self.chunk_bytes(body):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,85 @@
+from django.db import connection, models
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+SINCE_PARAM = "since"
+
+since_parameter = openapi.Parameter(
+    SINCE_PARAM,
+    openapi.IN_QUERY,
+    description="Cursor from the previous sync, `0` for the first one. Lists only rows changed after it.",
+    type=openapi.TYPE_STRING,
+)
+
+
+class ChangeTxidField(models.BigIntegerField):
+    """
+    Id of the last transaction that inserted or updated the row, written by a database trigger.
+    Rows created before the trigger keep 0, so they are returned by the first sync.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", 0)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+
+def parse_cursor(value):
+    try:
+        txid, _, pk = value.partition("-")
+        cursor = (int(txid), int(pk or 0))
+    except ValueError:
+        raise ValidationError({SINCE_PARAM: "Invalid cursor."})
+    if min(cursor) < 0:
+        raise ValidationError({SINCE_PARAM: "Invalid cursor."})
+    return cursor
+
+
+def format_cursor(cursor):
+    return "-".join(str(part) for part in cursor)
+
+
+def get_oldest_running_txid():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        return cursor.fetchone()[0]
+
+
+def filter_changed(queryset, cursor, until_txid):
+    txid, pk = cursor
+    return (
+        queryset.filter(change_txid__gte=txid, change_txid__lt=until_txid)
+        .exclude(change_txid=txid, pk__lte=pk)
+        .order_by("change_txid", "pk")
+    )
+
+
+class ChangeSyncMixin:
+    """
+    `?since=<cursor>` mode for list endpoints, returns rows changed after the cursor ordered by change.
+    Only rows of finished transactions are listed and the next cursor never passes the oldest running
+    transaction, so rows committed out of order are not skipped.
+    """
+
+    sync_serializer_class = None
+    sync_limit = 500
+
+    def is_sync_request(self):
+        return SINCE_PARAM in self.request.query_params
+
+    def sync_list(self, queryset):
+        since = parse_cursor(self.request.query_params[SINCE_PARAM])
+        # Read before the rows, everything below it is committed and visible to the next statement.
+        oldest_running_txid = get_oldest_running_txid()
+
+        rows = list(filter_changed(queryset, since, oldest_running_txid)[: self.sync_limit + 1])
+        more = len(rows) > self.sync_limit
+        if more:
+            rows = rows[: self.sync_limit]
+            cursor = (rows[-1].change_txid, rows[-1].pk)
+        else:
+            cursor = max(since, (oldest_running_txid, 0))
+
+        serializer = self.sync_serializer_class(rows, many=True, context=self.get_serializer_context())
+        return Response({"cursor": format_cursor(cursor), "more": more, "results": serializer.data})
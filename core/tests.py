@@ -0,0 +1,517 @@
+import json
+import re
+import os
+import subprocess
+import sys
+import threading
+import time
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from accounts.models import Profile, User
+from accounts.serializers import ProfileListSerializer, UserBasicInfoSerializer
+from album.models import Album, Image
+from album.serializers import AlbumListSerializer, AlbumSerializer
+from album.views import AlbumViewset
+from core.cachefiles import InstrumentedCachefileBackend
+from core.instrumentation import InstrumentedStorageMixin, RequestMetrics, current_metrics, time_query
+from core.metrics import get_registry
+from core.profiling import StackSampler, save_slow_request
+from core.parsers import CamelCaseJSONParser, CamelCaseMultiPartParser, build_key_map, underscoreize
+from core.renderers import CamelCaseJSONRenderer
+from core.tests_utils import album_list_url, create_user
+from core.urls import allowed_users_router, images_router, notes_router, router
+from core.values import compile_values_plan
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils.translation import gettext_lazy as _
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case.util import underscoreize as library_underscoreize
+from prometheus_client import REGISTRY
+from order.models import Note, NoteReadMarker, Order, OrderStats
+from order.serializers import OrderBulkTransitionSerializer
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class TestExplainQueriesCommand(TestCase):
+    def test_explain_queries_without_sequential_scans(self):
+        out = StringIO()
+        call_command("explain_queries", seed=True, users=300, random_seed=0, disable_seqscan=True, stdout=out)
+        # Every plan follows the name of its query, on a line of its own.
+        plans = dict(re.findall(r"^([a-z-]+)\n(.*?)(?=^[a-z-]+$|\Z)", out.getvalue(), re.MULTILINE | re.DOTALL))
+
+        self.assertEqual(
+            list(plans), ["order-list", "order-sync", "album-list", "order-notes-list", "order-notes-sync"]
+        )
+        for partition in ["order_order_active", "order_order_archive"]:
+            self.assertIn(f"Bitmap Heap Scan on {partition}", plans["order-list"])
+        self.assertEqual(plans["order-list"].count("Index Cond: (vendor_id = "), 2)
+        self.assertIn("One-Time Filter: false", plans["order-sync"])
+        self.assertIn("Index Scan using album_root_creator_name_idx", plans["album-list"])
+        self.assertRegex(plans["order-notes-list"], r"Index Scan using order_note_p\d{4}_\d{2}_order_id_created_idx")
+        self.assertIn("One-Time Filter: false", plans["order-notes-sync"])
+        self.assertIn("No sequential scans planned.", out.getvalue())
+
+
+class TestCamelCaseJSONRenderer(TestCase):
+    def test_output_matches_library_renderer(self):
+        data = {
+            "first_name": _("First name"),
+            "image_2_url": ("a", "b"),
+            "nested_list": [{"is_public": True, "created_at": None}, 1.5],
+            1: {"some_key": b"ab"},
+        }
+        self.assertEqual(CamelCaseJSONRenderer().render(data), LibraryCamelCaseJSONRenderer().render(data))
+
+    def test_benchmark_renderers_command(self):
+        out = StringIO()
+        call_command("benchmark_renderers", images=10, child_albums=2, repeat=1, stdout=out)
+        self.assertIn("output is identical", out.getvalue())
+
+
+class TestCamelCaseParsers(TestCase):
+    def parse(self, data, format):
+        request = Request(
+            APIRequestFactory().post("/", data, format=format),
+            parsers=[CamelCaseJSONParser(), CamelCaseMultiPartParser()],
+        )
+        request.parser_context["view"] = AlbumViewset(request=request, action="create", format_kwarg=None)
+        return request.data
+
+    def test_only_declared_keys_are_converted(self):
+        data = {"parentAlbum": 1, "isPublic": True, "other_key": 1, "otherKey": {"nestedKey": 1}}
+        self.assertEqual(
+            self.parse(data, "json"),
+            {"parent_album": 1, "is_public": True, "other_key": 1, "otherKey": {"nestedKey": 1}},
+        )
+
+    def test_multipart_keys_are_converted(self):
+        data = self.parse({"name": "Album", "isPublic": "true"}, "multipart")
+        self.assertEqual(data.dict(), {"name": "Album", "is_public": "true"})
+
+    def test_nested_serializer_keys_are_converted(self):
+        key_map = build_key_map(OrderBulkTransitionSerializer())
+        data = {"transitions": [{"order": 1, "status": 2}]}
+        self.assertEqual(underscoreize(data, key_map), data)
+        self.assertEqual(key_map["transitions"][1], {"order": ("order", None), "status": ("status", None)})
+
+    def test_without_serializer_matches_library(self):
+        data = {"firstName": "a", "nestedList": [{"someKey": 1}], "password1": "b"}
+        self.assertEqual(
+            underscoreize(data, None), library_underscoreize(data, **camel_case_settings.JSON_UNDERSCOREIZE)
+        )
+
+
+class TestValuesListSerializer(TestCase):
+    def setUp(self):
+        self.user = create_user(first_name="First", last_name="Last")
+        Profile.objects.create(name="NAME", description="DESC", owner=self.user)
+        Album.objects.create(name="NAME", creator=self.user)
+        self.request = Request(APIRequestFactory().get("/"))
+
+    def assert_same_output(self, serializer_class, queryset):
+        context = {"request": self.request}
+        expected = serializers.ListSerializer(child=serializer_class(), instance=list(queryset), context=context).data
+        with self.assertNumQueries(1):
+            data = serializer_class(queryset.all(), many=True, context=context).data
+        self.assertEqual(CamelCaseJSONRenderer().render(data), CamelCaseJSONRenderer().render(expected))
+
+    def test_album_list_output(self):
+        self.assert_same_output(AlbumListSerializer, Album.objects.order_by("pk"))
+
+    def test_profile_list_output(self):
+        self.assert_same_output(ProfileListSerializer, Profile.objects.all())
+
+    def test_user_list_output(self):
+        self.assert_same_output(UserBasicInfoSerializer, User.objects.order_by("pk"))
+
+    def test_method_fields_are_serialized_from_instances(self):
+        self.assertIsNone(compile_values_plan(AlbumSerializer()))
+
+    def test_benchmark_serializers_command(self):
+        out = StringIO()
+        call_command("benchmark_serializers", rows=20, repeat=1, stdout=out)
+        self.assertIn("output is identical", out.getvalue())
+
+
+class InstrumentedFileSystemStorage(InstrumentedStorageMixin, FileSystemStorage):
+    pass
+
+
+class TestServerTiming(APITestCase):
+    def setUp(self):
+        self.user = create_user(is_staff=True)
+        Album.objects.create(name="NAME", creator=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_counts_queries(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs("core.instrumentation", "DEBUG") as logs:
+            response = self.client.get(album_list_url)
+        self.assertGreater(len(queries), 0)
+        server_timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(queries)} queries"', server_timing)
+        self.assertIn('storage;dur=0.0;desc="0 calls"', server_timing)
+        self.assertRegex(server_timing, r"app;dur=\d+\.\d")
+        self.assertIn(f"method=GET path={album_list_url} status=200", logs.output[0])
+        self.assertEqual(logs.records[0].request_metrics["db_queries"], len(queries))
+
+    def test_server_timing_only_for_staff(self):
+        self.client.force_authenticate(user=create_user("user@test.com"))
+        self.assertNotIn("Server-Timing", self.client.get(album_list_url))
+        with override_settings(SERVER_TIMING=True):
+            self.assertIn("Server-Timing", self.client.get(album_list_url))
+        with override_settings(DEBUG=True):
+            self.assertIn("Server-Timing", self.client.get(album_list_url))
+
+    def test_storage_calls_are_timed(self):
+        with TemporaryDirectory() as location:
+            storage = InstrumentedFileSystemStorage(location=location)
+            storage.save("outside.txt", ContentFile(b"data"))
+
+            metrics = RequestMetrics()
+            token = current_metrics.set(metrics)
+            try:
+                name = storage.save("file.txt", ContentFile(b"data"))
+                self.assertTrue(storage.exists(name))
+                storage.delete(name)
+            finally:
+                current_metrics.reset(token)
+
+        # save() checks the name is free before saving.
+        self.assertEqual(metrics.storage.count, 4)
+        self.assertIn('desc="4 calls"', metrics.get_server_timing())
+        self.assertEqual(metrics.storage.calls, [])
+
+    def test_calls_are_recorded_on_demand(self):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with connection.execute_wrapper(time_query):
+                User.objects.count()
+                metrics.record_calls = True
+                User.objects.exists()
+        finally:
+            current_metrics.reset(token)
+
+        self.assertEqual(metrics.db.count, 2)
+        self.assertEqual(len(metrics.db.calls), 1)
+        self.assertIn("LIMIT 1", metrics.db.calls[0][0])
+
+
+class CacheFile:
+    def __init__(self, name, storage):
+        self.name = name
+        self.storage = storage
+
+    def _generate(self):
+        self.storage.save(self.name, ContentFile(b"data"))
+
+    def close(self):
+        pass
+
+
+class TestMetrics(APITestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def get_sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    @override_settings(METRICS_TOKEN="token")
+    def test_requests_are_observed_by_route(self):
+        labels = {"route": "album-list", "method": "GET"}
+        count = self.get_sample("http_requests_total", status="200", **labels)
+        queries_count = self.get_sample("http_request_db_queries_count", route="album-list")
+        self.client.get(album_list_url)
+        self.assertEqual(self.get_sample("http_requests_total", status="200", **labels), count + 1)
+        self.assertEqual(self.get_sample("http_request_db_queries_count", route="album-list"), queries_count + 1)
+
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            b'http_request_duration_seconds_bucket{le="0.005",method="GET",route="album-list"}', response.content
+        )
+
+    @override_settings(METRICS_TOKEN="token")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer tokén").status_code, 401)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer token")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_without_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    def test_metrics_of_processes_are_summed(self):
+        code = 'from core.metrics import requests_total; requests_total.labels("test-route", "GET", 200).inc()'
+        with TemporaryDirectory() as path, mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": path}):
+            for _ in range(2):
+                subprocess.run([sys.executable, "-c", code], check=True, env=os.environ)
+            value = get_registry().get_sample_value(
+                "http_requests_total", {"route": "test-route", "method": "GET", "status": "200"}
+            )
+        self.assertEqual(value, 2)
+
+    def test_cachefile_backend(self):
+        backend = InstrumentedCachefileBackend()
+        generations = self.get_sample("thumbnail_generation_duration_seconds_count")
+        hits = self.get_sample("cache_requests_total", cache="imagekit_state", result="hit")
+        with TemporaryDirectory() as location:
+            file = CacheFile("thumbnail.jpg", FileSystemStorage(location=location))
+            backend.generate_now(file)
+            self.assertTrue(backend.exists(file))
+        self.assertEqual(self.get_sample("thumbnail_generation_duration_seconds_count"), generations + 1)
+        self.assertEqual(self.get_sample("cache_requests_total", cache="imagekit_state", result="hit"), hits + 1)
+
+
+def sleeping_view():
+    time.sleep(0.05)
+
+
+class TestSlowRequests(APITestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.staff = create_user(email="staff@test.com", is_staff=True)
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_slow_requests_ring_buffer(self):
+        self.client.force_authenticate(user=self.user)
+        with override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_DIR=self.directory.name, SLOW_REQUEST_LIMIT=3):
+            for _ in range(4):
+                self.client.get(album_list_url)
+            self.assertEqual(self.client.get(reverse("slow-request-list")).status_code, 403)
+
+            self.client.force_authenticate(user=self.staff)
+            response = self.client.get(reverse("slow-request-list"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [record["route"] for record in response.data], ["slow-request-list", "album-list", "album-list"]
+            )
+
+            response = self.client.get(reverse("slow-request-detail", args=[response.data[1]["id"]]))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["status"], 200)
+            self.assertEqual(len(response.data["queries"]), response.data["queries_count"])
+            self.assertIn("SELECT", response.data["queries"][0]["sql"])
+            self.assertIn("profile", response.data)
+
+            self.assertEqual(self.client.get(reverse("slow-request-detail", args=["x"])).status_code, 404)
+
+    def test_fast_requests_are_not_saved(self):
+        self.client.force_authenticate(user=self.staff)
+        with override_settings(SLOW_REQUEST_THRESHOLD_MS=60000, SLOW_REQUEST_DIR=self.directory.name):
+            self.client.get(album_list_url)
+            self.assertEqual(self.client.get(reverse("slow-request-list")).data, [])
+
+    def test_stack_sampler(self):
+        sampler = StackSampler(0.001)
+        sampler.start(threading.get_ident())
+        sleeping_view()
+        samples = sampler.stop(threading.get_ident())
+        self.assertTrue(any(stack[-1].endswith(":sleeping_view") for stack in samples))
+
+    def test_profile_param(self):
+        for user, content_type in [(self.user, "application/json"), (self.staff, "text/plain; charset=utf-8")]:
+            token = RefreshToken.for_user(user).access_token
+            response = self.client.get(f"{album_list_url}?profile=1", HTTP_AUTHORIZATION=f"JWT {token}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], content_type)
+        self.assertIn("cumulative", response.content.decode())
+
+
+class TestSeedDatasetCommand(TestCase):
+    def test_seed_dataset(self):
+        with TemporaryDirectory() as media_dir:
+            options = {"scale": 0.0005, "files": 2, "image_width": 32, "image_height": 24, "media_dir": media_dir}
+            call_command("seed_dataset", stdout=StringIO(), **options)
+            self.assertEqual(len(os.listdir(os.path.join(media_dir, "media", "private", "seed"))), 2)
+            with self.assertRaises(CommandError):
+                call_command("seed_dataset", stdout=StringIO(), **options)
+
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Profile.objects.filter(search_vector__isnull=False).count(), 1)
+        self.assertTrue(Album.objects.filter(parent_album__isnull=False).exists())
+        self.assertEqual(Image.objects.count(), 500)
+        self.assertEqual(set(Order.objects.values_list("status", flat=True)), set(range(7)))
+        self.assertEqual(Order.objects.filter(search_vector__isnull=True).count(), 0)
+        # Every note is unread by the other side of its order.
+        self.assertEqual(NoteReadMarker.objects.aggregate(unread=Sum("unread"))["unread"], Note.objects.count())
+        self.assertEqual(NoteReadMarker.objects.count(), 50)
+        self.assertEqual(OrderStats.objects.aggregate(orders=Sum("orders"))["orders"], 25)
+
+    def test_seed_dataset_upload(self):
+        with TemporaryDirectory() as location:
+            storage = FileSystemStorage(location=location)
+            with mock.patch.object(Image._meta.get_field("image"), "storage", storage):
+                options = {"scale": 0.0005, "files": 2, "image_width": 32, "image_height": 24, "upload": True}
+                call_command("seed_dataset", stdout=StringIO(), **options)
+            self.assertEqual(sorted(os.listdir(os.path.join(location, "seed"))), ["image_0.jpg", "image_1.jpg"])
+            self.assertTrue(storage.exists(Image.objects.order_by("pk").first().image.name))
+
+
+class TestBenchmarkEndpointsCommand(TransactionTestCase):
+    def test_benchmark_endpoints(self):
+        call_command("seed_dataset", scale=0.0005, files=0, stdout=StringIO())
+        costs = dict(Order.objects.values_list("pk", "cost"))
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            options = {"requests": 4, "warmup": 0, "concurrency": 2, "stdout": StringIO()}
+            call_command("benchmark_endpoints", output=output, routes=["album-list", "order-update"], **options)
+            with open(output) as file:
+                routes = json.load(file)["routes"]
+
+            out = StringIO()
+            call_command("benchmark_endpoints", compare=output, routes=["album-list"], **{**options, "stdout": out})
+
+        self.assertEqual([route["name"] for route in routes], ["album-list", "order-update"])
+        for route in routes:
+            self.assertEqual(route["requests"], 4)
+            self.assertEqual(route["errors"], 0)
+            self.assertGreater(route["queries_per_request"], 0)
+            self.assertLessEqual(route["latency_ms"]["p50"], route["latency_ms"]["p99"])
+        self.assertIn("p95", out.getvalue())
+        self.assertEqual(dict(Order.objects.values_list("pk", "cost")), costs)
+
+
+class TestBenchmarkImagesCommand(TestCase):
+    def test_benchmark_images(self):
+        storage = Image._meta.get_field("image").storage
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            options = {"megapixels": [0.01], "formats": ["jpeg", "rgba"], "repeat": 2, "stdout": StringIO()}
+            call_command("benchmark_images", storage="disk", output=output, **options)
+            with open(output) as file:
+                results = json.load(file)["results"]
+
+        self.assertEqual(
+            [(result["format"], result["stage"]) for result in results[:3]],
+            [("jpeg", "storage"), ("jpeg", "upload"), ("jpeg", "thumbnail")],
+        )
+        self.assertEqual(len(results), 6)
+        for result in results:
+            self.assertGreater(result["images_per_second"], 0)
+            self.assertGreaterEqual(result["memory_mb_per_upload"], 0)
+        # Nothing is left behind.
+        self.assertIs(Image._meta.get_field("image").storage, storage)
+        self.assertFalse(Image.objects.exists())
+
+
+class QueryBudgetData:
+    """
+    Data of every read route, with `size` rows of everything the routes list or join.
+    """
+
+    def __init__(self, size, slow_request_dir):
+        self.vendor = create_user(email="vendor@test.com", first_name="Vendor", last_name="Vendor")
+        self.staff = create_user(email="staff@test.com", is_staff=True)
+        Profile.objects.create(name="Vendor", description="DESC", owner=self.vendor)
+        # Created in bulk, hashing a password per user would make up most of the test's time.
+        clients = User.objects.bulk_create(
+            User(email=f"client{i}@test.com", first_name=f"First{i}", is_vendor=True) for i in range(size)
+        )
+        portfolios = Album.objects.bulk_create(
+            Album(name="Portfolio", creator=client, is_public=True) for client in clients
+        )
+        Profile.objects.bulk_create(
+            Profile(name=f"Profile {i}", description="DESC", owner=client, portfolio=portfolio)
+            for i, (client, portfolio) in enumerate(zip(clients, portfolios))
+        )
+
+        self.album = Album.objects.create(name="Album", creator=self.vendor)
+        self.album.allowed_users.add(*clients)
+        Album.objects.bulk_create(Album(name=f"Album {i}", creator=self.vendor) for i in range(size))
+        Album.objects.bulk_create(
+            Album(name=f"Child {i}", creator=self.vendor, parent_album=self.album) for i in range(size)
+        )
+        # Without signals, which would generate thumbnails of the files.
+        images = Image.objects.bulk_create(
+            Image(album=self.album, author=self.vendor, image=f"image_{i}.jpg", height=100, width=100)
+            for i in range(size)
+        )
+        self.image = images[0]
+
+        orders = [
+            Order.objects.create(vendor=self.vendor, client=client, description="DESC", status=i % 7)
+            for i, client in enumerate(clients)
+        ]
+        self.order = orders[0]
+        for i in range(size):
+            Note.objects.create(order=self.order, user=self.vendor if i % 2 else clients[0], note="NOTE")
+
+        with override_settings(SLOW_REQUEST_DIR=slow_request_dir):
+            record = {name: None for name in ["method", "path", "route", "status", "created", "duration_ms"]}
+            self.slow_request = save_slow_request({**record, "queries": [], "queries_count": 0, "profile": []})
+
+
+# Route name -> maximum number of queries of a GET request, the same for any number of rows,
+# and the URL kwargs and query string of the request.
+QUERY_BUDGETS = {
+    "order-list": (2, lambda data: {}, ""),
+    "order-stats": (2, lambda data: {}, ""),
+    "order-detail": (1, lambda data: {"pk": data.order.pk}, ""),
+    "album-list": (2, lambda data: {}, ""),
+    "album-detail": (6, lambda data: {"pk": data.album.pk}, ""),
+    "profile-list": (2, lambda data: {}, ""),
+    "profile-detail": (2, lambda data: {"pk": data.vendor.profile.pk}, ""),
+    "user-list": (2, lambda data: {}, "?search=First"),
+    "user-autocomplete": (1, lambda data: {}, "?search=First"),
+    "slow-request-list": (0, lambda data: {}, ""),
+    "slow-request-detail": (0, lambda data: {"pk": data.slow_request}, ""),
+    "order-notes-list": (5, lambda data: {"order_pk": data.order.pk}, ""),
+    "album-images-detail": (3, lambda data: {"album_pk": data.album.pk, "pk": data.image.pk}, ""),
+    "album-images-thumbnail": (3, lambda data: {"album_pk": data.album.pk, "pk": data.image.pk}, ""),
+}
+
+
+class TestQueryBudgets(APITestCase):
+    """
+    Fails when the number of queries of a read route grows with the number of rows, or exceeds its budget.
+    New routes need a budget in QUERY_BUDGETS.
+    """
+
+    def get_read_routes(self):
+        for urls_router in [router, notes_router, allowed_users_router, images_router]:
+            for pattern in urls_router.urls:
+                if "get" in pattern.callback.actions:
+                    yield pattern.name
+
+    def count_queries(self, name, size):
+        _, get_kwargs, query_string = QUERY_BUDGETS[name]
+        with transaction.atomic(), TemporaryDirectory() as slow_request_dir:
+            data = QueryBudgetData(size, slow_request_dir)
+            url = reverse(name, kwargs=get_kwargs(data)) + query_string
+            self.client.force_authenticate(user=data.staff if name.startswith("slow-request") else data.vendor)
+            with override_settings(SLOW_REQUEST_DIR=slow_request_dir):
+                # Not counting queries of the first request only, e.g. of content types cached afterwards.
+                self.client.get(url)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+            self.assertLess(response.status_code, 400, f"{name}: {response.status_code}")
+            transaction.set_rollback(True)
+        return len(queries)
+
+    def test_every_read_route_has_budget(self):
+        self.assertEqual(set(self.get_read_routes()), set(QUERY_BUDGETS))
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        for name, (budget, _, _) in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                queries = self.count_queries(name, 1)
+                self.assertEqual(self.count_queries(name, 50), queries)
+                self.assertLessEqual(queries, budget)
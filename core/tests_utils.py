@@ -7,6 +7,9 @@ from rest_framework.reverse import reverse
 album_list_url = reverse("album-list")
 profile_list_url = reverse("profile-list")
 order_list_url = reverse("order-list")
+order_stats_url = reverse("order-stats")
+order_transitions_url = reverse("order-transitions")
+user_autocomplete_url = reverse("user-autocomplete")
 
 
 def profile_detail_url(pk):
@@ -21,14 +24,27 @@ def order_note_list_url(order_pk):
     return reverse("order-notes-list", kwargs={"order_pk": order_pk})
 
 
+def order_note_read_url(order_pk):
+    return reverse("order-notes-read", kwargs={"order_pk": order_pk})
+
+
 def order_note_detail_url(order_pk, pk):
     return reverse("order-notes-detail", kwargs={"order_pk": order_pk, "pk": pk})
 
 
+def order_note_stream_url(order_pk):
+    # Served by the ASGI application only, so it is not part of the URLconf.
+    return f"/orders/{order_pk}/notes/stream/"
+
+
 def album_images_detail_url(album_pk, pk):
     return reverse("album-images-detail", kwargs={"album_pk": album_pk, "pk": pk})
 
 
+def album_image_thumbnail_url(album_pk, pk):
+    return reverse("album-images-thumbnail", kwargs={"album_pk": album_pk, "pk": pk})
+
+
 def album_detail_url(pk):
     return reverse("album-detail", kwargs={"pk": pk})
 
@@ -15,6 +15,8 @@ Including another URLconf
 """
 from accounts.views import FacebookLogin, GoogleLogin, ProfileViewSet, UserViewSet
 from album.views import AlbumViewset, AllowedUsersViewSet, ImageViewset
+from core.metrics import metrics_view
+from core.views import SlowRequestViewSet
 from dj_rest_auth.registration.views import ConfirmEmailView, VerifyEmailView
 from django.conf import settings
 from django.conf.urls import include
@@ -52,6 +54,7 @@ router.register(r"orders", OrderViewSet)
 router.register(r"albums", AlbumViewset)
 router.register(r"profiles", ProfileViewSet)
 router.register(r"dj-rest-auth/users", UserViewSet)
+router.register(r"slow-requests", SlowRequestViewSet, basename="slow-request")
 
 notes_router = routers.NestedSimpleRouter(router, r"orders", lookup="order")
 notes_router.register(r"notes", NoteViewSet, basename="order-notes")
@@ -65,6 +68,7 @@ images_router.register(r"images", ImageViewset, basename="album-images")
 urlpatterns = (
     [
         path("admin/", admin.site.urls),
+        path("metrics", metrics_view, name="metrics"),
         # path("user/", include("user.urls")),
         path("", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
         path("dj-rest-auth/", include("dj_rest_auth.urls")),
@@ -0,0 +1,149 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.query import ModelIterable
+from django.utils.functional import cached_property
+from rest_framework import mixins, serializers
+
+IDENTITY_FIELDS = [
+    (serializers.CharField, models.CharField),
+    (serializers.CharField, models.TextField),
+    (serializers.IntegerField, models.IntegerField),
+    (serializers.IntegerField, models.AutoField),
+    (serializers.BooleanField, models.BooleanField),
+]
+
+
+def get_model_field(model, source_attrs):
+    # Only columns of the model or of models joined through foreign keys can be read with values().
+    for attr in source_attrs[:-1]:
+        field = get_model_field(model, [attr])
+        if field is None or not field.many_to_one and not field.one_to_one:
+            return None
+        model = field.related_model
+    try:
+        field = model._meta.get_field(source_attrs[-1])
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    return field
+
+
+def get_file_representation(field, model_field):
+    def to_representation(name):
+        return field.to_representation(model_field.attr_class(None, model_field, name))
+
+    return to_representation
+
+
+def get_representation(field, model_field):
+    """
+    Returns the function converting the column value to the field's output, None if the value is output as it is.
+    """
+    if isinstance(model_field, models.FileField):
+        return get_file_representation(field, model_field)
+    for serializer_field_class, model_field_class in IDENTITY_FIELDS:
+        if type(field).to_representation is serializer_field_class.to_representation and isinstance(
+            model_field, model_field_class
+        ):
+            return None
+    return field.to_representation
+
+
+def compile_values_plan(serializer, prefix=""):
+    """
+    Plan of `(field name, values() lookup, representation, nested plan)` for the readable fields of `serializer`,
+    None if any of them is not read from a column, as method fields or many to many relations.
+    """
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return None
+    plan = []
+    for field in serializer._readable_fields:
+        if field.source == "*" or isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            return None
+        model_field = get_model_field(serializer.Meta.model, field.source_attrs)
+        if model_field is None:
+            return None
+        lookup = prefix + "__".join(field.source_attrs)
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = compile_values_plan(field, f"{lookup}__") if model_field.is_relation else None
+            if nested is None:
+                return None
+            plan.append((field.field_name, lookup, None, nested))
+        elif model_field.is_relation:
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                return None
+            plan.append((field.field_name, lookup, None, None))
+        else:
+            plan.append((field.field_name, lookup, get_representation(field, model_field), None))
+    return plan
+
+
+def get_lookups(plan):
+    for _, lookup, _, nested in plan:
+        yield lookup
+        if nested is not None:
+            yield from get_lookups(nested)
+
+
+def build_row(row, plan):
+    ret = {}
+    for name, lookup, representation, nested in plan:
+        value = row[lookup]
+        if value is None:
+            # Same as for a null attribute in Serializer.to_representation, also a null foreign key of nested data.
+            ret[name] = None
+        elif nested is not None:
+            ret[name] = build_row(row, nested)
+        elif representation is None:
+            ret[name] = value
+        else:
+            ret[name] = representation(value)
+    return ret
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+    Read-only list serializer which builds the output from `values()` rows instead of model instances.
+    Querysets are read with `values()` of the columns the child serializer outputs, the fields are not
+    called per row unless their value needs converting. Serializers with fields which cannot be read
+    from columns, and lists of instances, are serialized as usual.
+    """
+
+    @cached_property
+    def values_plan(self):
+        return compile_values_plan(self.child)
+
+    def get_values_queryset(self, queryset):
+        # Evaluated querysets, e.g. prefetched ones, already hold the instances.
+        if (
+            self.values_plan is None
+            or queryset._result_cache is not None
+            or queryset._iterable_class is not ModelIterable
+        ):
+            return queryset
+        return queryset.values(*get_lookups(self.values_plan))
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        if isinstance(data, models.QuerySet):
+            data = self.get_values_queryset(data)
+        plan = self.values_plan
+        return [
+            build_row(item, plan) if plan is not None and isinstance(item, dict) else self.child.to_representation(item)
+            for item in data
+        ]
+
+
+class ValuesListModelMixin(mixins.ListModelMixin):
+    """
+    List action paginating `values()` rows, when the serializer's `list_serializer_class` is `ValuesListSerializer`.
+    """
+
+    def paginate_queryset(self, queryset):
+        serializer = self.get_serializer(many=True)
+        if isinstance(serializer, ValuesListSerializer):
+            queryset = serializer.get_values_queryset(queryset)
+        return super().paginate_queryset(queryset)
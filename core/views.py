@@ -0,0 +1,25 @@
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from .profiling import get_slow_request, get_slow_requests
+
+SUMMARY_FIELDS = ["id", "method", "path", "route", "status", "created", "duration_ms", "queries_count"]
+
+
+class SlowRequestViewSet(viewsets.ViewSet):
+    """
+    Requests slower than `SLOW_REQUEST_THRESHOLD_MS` saved by `SlowRequestMiddleware`, newest first.
+    Details include the queries, storage calls and sampled stacks.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request):
+        return Response([{name: record[name] for name in SUMMARY_FIELDS} for record in get_slow_requests()])
+
+    def retrieve(self, request, pk=None):
+        record = get_slow_request(pk)
+        if record is None:
+            raise NotFound({"pk": "No slow request matches the given id."})
+        return Response(record)
@@ -0,0 +1,19 @@
+import os
+import shutil
+import tempfile
+
+# Workers write their Prometheus metrics to this directory and /metrics sums them up, see core.metrics.
+# Set before the workers import prometheus_client, which picks its storage on import.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus"))
+
+
+def on_starting(server):
+    # Metrics of the previous run would be added to the new ones.
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
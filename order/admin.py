@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Note, Order
+from .models import Note, NoteReadMarker, Order, OrderStats
 
 admin.site.register(Order)
 admin.site.register(Note)
+admin.site.register(OrderStats)
+admin.site.register(NoteReadMarker)
@@ -0,0 +1,19 @@
+from core.partitions import create_month_partitions
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.models import Note
+
+
+class Command(BaseCommand):
+    help = "Creates monthly note partitions ahead of time and for notes which landed in the default partition."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=3, help="Number of months ahead to create partitions for.")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        partitions = create_month_partitions(Note._meta.db_table, "created", options["months"])
+        for name in partitions:
+            self.stdout.write(name)
+        self.stdout.write(self.style.SUCCESS(f"Created {len(partitions)} note partitions."))
@@ -0,0 +1,30 @@
+from core.partitions import create_partition, get_partitions
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from order.models import Order
+from order.transitions import FINAL_STATUSES
+
+ARCHIVE_PARTITION = "order_order_archive"
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the partition of archived orders by moving them out of the default partition. "
+        "Needed once after migrating a database which had archived orders."
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        table = Order._meta.db_table
+        if ARCHIVE_PARTITION in get_partitions(table):
+            self.stdout.write(self.style.SUCCESS("The archived orders partition already exists."))
+            return
+
+        statuses = ", ".join(str(status) for status in FINAL_STATUSES)
+        create_partition(table, ARCHIVE_PARTITION, f"FOR VALUES IN ({statuses})", f"status IN ({statuses})", [])
+        with connection.cursor() as cursor:
+            # The moved orders were deleted from the default partition, which also removed their ids.
+            cursor.execute(f'INSERT INTO order_order_id SELECT id FROM "{ARCHIVE_PARTITION}"')
+            count = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(f"Moved {count} archived orders to {ARCHIVE_PARTITION}."))
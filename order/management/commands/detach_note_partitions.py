@@ -0,0 +1,22 @@
+from core.partitions import detach_month_partitions
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        "Detaches monthly note partitions older than the given number of months. "
+        "Detached partitions are kept as standalone tables, their notes are no longer listed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", type=int, default=24, help="Number of past months to keep attached.")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        partitions = detach_month_partitions(Note._meta.db_table, options["keep"])
+        for name in partitions:
+            self.stdout.write(name)
+        self.stdout.write(self.style.SUCCESS(f"Detached {len(partitions)} note partitions."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from order.models import Order, OrderStats
+
+
+class Command(BaseCommand):
+    help = "Recomputes the order stats summary table from all orders."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        OrderStats.objects.all().delete()
+        buckets = (
+            Order.objects.annotate(month=TruncMonth("created"))
+            .values("vendor", "status", "currency", "month")
+            .annotate(orders=Count("id"), revenue=Coalesce(Sum("cost"), 0.0))
+            .order_by()
+        )
+        stats = OrderStats.objects.bulk_create(
+            (
+                OrderStats(
+                    vendor_id=bucket["vendor"],
+                    status=bucket["status"],
+                    currency=bucket["currency"],
+                    month=bucket["month"].date(),
+                    orders=bucket["orders"],
+                    revenue=bucket["revenue"],
+                )
+                for bucket in buckets.iterator()
+            ),
+            batch_size=1000,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(stats)} order stats rows."))
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from core.search import build_search_vector
+from django.db import migrations
+
+
+def update_search_vector(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+    fields = ["vendor__profile__name", "client__first_name", "client__last_name", "client__email"]
+    Order.objects.update(search_vector=build_search_vector(Order, fields))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_profile_search_vector'),
+        ('order', '0012_order_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='order_order_search__100348_gin'),
+        ),
+        migrations.RunPython(update_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def build_order_stats(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+    OrderStats = apps.get_model("order", "OrderStats")
+    buckets = (
+        Order.objects.annotate(month=TruncMonth("created"))
+        .values("vendor", "status", "currency", "month")
+        .annotate(orders=Count("id"), revenue=Coalesce(Sum("cost"), 0.0))
+        .order_by()
+    )
+    OrderStats.objects.bulk_create(
+        OrderStats(
+            vendor_id=bucket["vendor"],
+            status=bucket["status"],
+            currency=bucket["currency"],
+            month=bucket["month"].date(),
+            orders=bucket["orders"],
+            revenue=bucket["revenue"],
+        )
+        for bucket in buckets
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('order', '0014_order_note_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'Canceled'), (1, 'Rejected'), (2, 'Waiting for acceptance'), (3, 'Accepted'), (4, 'Waiting for payment'), (5, 'Payment received'), (6, 'Finished')])),
+                ('currency', models.CharField(choices=[('PLN', 'Polish Zloty'), ('EUR', 'Euro'), ('USD', 'United States Dollar')], max_length=3)),
+                ('month', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('revenue', models.FloatField(default=0)),
+                ('vendor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='orderstats',
+            constraint=models.UniqueConstraint(fields=('vendor', 'status', 'currency', 'month'), name='order_stats_bucket_unique'),
+        ),
+        migrations.RunPython(build_order_stats, migrations.RunPython.noop),
+    ]
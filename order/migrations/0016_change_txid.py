@@ -0,0 +1,63 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:28
+
+import core.sync
+from django.db import migrations, models
+
+ORDER_COLUMNS = ["description", "status", "cost", "currency", "vendor_id", "client_id", "album_id", "created"]
+NOTE_COLUMNS = ["user_id", "order_id", "note", "created"]
+
+
+def create_trigger(table, columns):
+    return (
+        f'CREATE TRIGGER "{table}_change_txid" BEFORE INSERT OR UPDATE OF {", ".join(columns)} '
+        f'ON "{table}" FOR EACH ROW EXECUTE PROCEDURE set_change_txid();'
+    )
+
+
+def drop_trigger(table):
+    return f'DROP TRIGGER "{table}_change_txid" ON "{table}";'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0015_orderstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='change_txid',
+            field=core.sync.ChangeTxidField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='change_txid',
+            field=core.sync.ChangeTxidField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['order', 'change_txid', 'id'], name='note_order_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['client', 'change_txid', 'id'], name='order_client_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['vendor', 'change_txid', 'id'], name='order_vendor_change_idx'),
+        ),
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION set_change_txid() RETURNS trigger AS $$
+            BEGIN
+                NEW.change_txid := txid_current();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            "DROP FUNCTION set_change_txid();",
+        ),
+        migrations.RunSQL(create_trigger("order_order", ORDER_COLUMNS), drop_trigger("order_order")),
+        migrations.RunSQL(create_trigger("order_note", NOTE_COLUMNS), drop_trigger("order_note")),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('order', '0016_change_txid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteReadMarker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread', models.PositiveIntegerField(default=0)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to='order.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='notereadmarker',
+            constraint=models.UniqueConstraint(fields=('order', 'user'), name='note_read_marker_unique'),
+        ),
+        # Notes written before the markers existed count as read.
+        migrations.RunSQL(
+            """
+            INSERT INTO order_notereadmarker (order_id, user_id, unread)
+            SELECT id, vendor_id, 0 FROM order_order
+            UNION
+            SELECT id, client_id, 0 FROM order_order
+            ON CONFLICT DO NOTHING;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
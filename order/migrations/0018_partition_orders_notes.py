@@ -0,0 +1,223 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:36
+
+from datetime import date
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+ARCHIVE_STATUSES = [0, 1, 6]
+NOTE_MONTHS_AHEAD = 12
+
+
+def fetch(schema_editor, sql, params=None):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def get_definitions(schema_editor, table):
+    """
+    Returns the sequence of the id column and the names and definitions of the indexes, foreign keys and triggers
+    of `table`, except its primary key.
+    """
+    sequence = fetch(schema_editor, "SELECT pg_get_serial_sequence(%s, 'id')", [table])[0][0]
+    indexes = fetch(
+        schema_editor,
+        """
+        SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index
+        WHERE indrelid = %s::regclass AND NOT indisprimary
+        """,
+        [table],
+    )
+    foreign_keys = fetch(
+        schema_editor,
+        """
+        SELECT conname,
+            format('ALTER TABLE %%I ADD CONSTRAINT %%I %%s', conrelid::regclass, conname, pg_get_constraintdef(oid))
+        FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f' AND conparentid = 0
+        """,
+        [table],
+    )
+    triggers = fetch(
+        schema_editor,
+        "SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+        [table],
+    )
+    return sequence, indexes, foreign_keys, triggers
+
+
+def partition_table(schema_editor, table, partition_by, primary_key, default_partition):
+    """
+    Partitions `table` with `partition_by` without copying its rows: the table is renamed to `default_partition`
+    and attached as the default partition of a new table with its name, indexes, foreign keys and triggers.
+    Only the new primary key is built, the other indexes and foreign keys of the default partition are attached.
+    """
+    sequence, indexes, foreign_keys, triggers = get_definitions(schema_editor, table)
+    for name, _ in triggers:
+        # Triggers of the partitioned table are cloned to its partitions.
+        schema_editor.execute(f'DROP TRIGGER "{name}" ON "{table}"')
+    schema_editor.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT "{table}_pkey"')
+    for name, _ in indexes:
+        # Index names are unique in the schema, the indexes of the partitioned table take the current ones.
+        schema_editor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:55]}_default"')
+
+    schema_editor.execute(f'ALTER TABLE "{table}" RENAME TO "{default_partition}"')
+    schema_editor.execute(
+        f'CREATE TABLE "{table}" (LIKE "{default_partition}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) {partition_by}'
+    )
+    schema_editor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default_partition}" DEFAULT')
+    schema_editor.execute(f"ALTER SEQUENCE {sequence} OWNED BY \"{table}\".id")
+
+    schema_editor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({", ".join(primary_key)})')
+    for _, sql in indexes + foreign_keys + triggers:
+        schema_editor.execute(sql)
+
+
+def unpartition_table(schema_editor, table):
+    """
+    Recreates the partitioned `table` as a regular table with its rows, indexes, foreign keys and triggers.
+    """
+    sequence, indexes, foreign_keys, triggers = get_definitions(schema_editor, table)
+    old_table = f"{table}_old"
+    schema_editor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+    schema_editor.execute(f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    schema_editor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old_table}"')
+    schema_editor.execute(f"ALTER SEQUENCE {sequence} OWNED BY \"{table}\".id")
+    schema_editor.execute(f'DROP TABLE "{old_table}"')
+
+    schema_editor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id)')
+    for _, sql in indexes + foreign_keys + triggers:
+        schema_editor.execute(sql.replace(" ON ONLY ", " ON "))
+
+
+def add_months(month, months):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+def create_order_partitions(schema_editor):
+    """
+    Creates the archive partition when no archived orders are in the default partition, otherwise
+    `create_order_partitions` creates it by moving them.
+    """
+    statuses = ", ".join(str(status) for status in ARCHIVE_STATUSES)
+    if not fetch(schema_editor, f"SELECT EXISTS (SELECT FROM order_order_active WHERE status IN ({statuses}))")[0][0]:
+        schema_editor.execute(f"CREATE TABLE order_order_archive PARTITION OF order_order FOR VALUES IN ({statuses})")
+
+
+def create_note_partitions(schema_editor):
+    """
+    Creates the partitions of the coming months, from the month after the last note. Notes of the earlier months
+    stay in the default partition until `create_note_partitions` moves them.
+    """
+    now = timezone.now()
+    last = fetch(schema_editor, "SELECT max(created) FROM order_note_default")[0][0]
+    month = add_months(date(last.year, last.month, 1), 1) if last else date(now.year, now.month, 1)
+    # Proves the default partition has no notes of the new partitions, which are then created without scanning it.
+    start = f"{month:%Y-%m-%d} 00:00:00+00"
+    schema_editor.execute(
+        f"ALTER TABLE order_note_default ADD CONSTRAINT order_note_default_before CHECK (created < '{start}')"
+    )
+    while month <= add_months(date(now.year, now.month, 1), NOTE_MONTHS_AHEAD):
+        start, end = [f"{bound:%Y-%m-%d} 00:00:00+00" for bound in (month, add_months(month, 1))]
+        schema_editor.execute(
+            f"CREATE TABLE order_note_p{month:%Y_%m} PARTITION OF order_note FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        month = add_months(month, 1)
+    schema_editor.execute("ALTER TABLE order_note_default DROP CONSTRAINT order_note_default_before")
+
+
+def add_order_ids(schema_editor):
+    """
+    Postgres requires the partition key in the primary and unique keys of partitioned tables, so ids of orders
+    are also kept in order_order_id, whose primary key keeps them unique across partitions and is referenced
+    by notes and read markers instead. A trigger maintains it, including moves between partitions, which
+    Postgres runs as a delete and an insert.
+    """
+    id_type = fetch(
+        schema_editor,
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = 'order_order'::regclass "
+        "AND attname = 'id'",
+    )[0][0]
+    schema_editor.execute(f"CREATE TABLE order_order_id (id {id_type} PRIMARY KEY)")
+    schema_editor.execute("INSERT INTO order_order_id SELECT id FROM order_order")
+    schema_editor.execute(
+        """
+        CREATE FUNCTION track_order_id() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM order_order_id;
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM order_order_id WHERE id = OLD.id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO order_order_id VALUES (NEW.id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    schema_editor.execute(
+        """
+        CREATE TRIGGER order_order_track_id AFTER INSERT OR DELETE OR UPDATE OF id ON order_order
+        FOR EACH ROW EXECUTE FUNCTION track_order_id()
+        """
+    )
+    schema_editor.execute(
+        "CREATE TRIGGER order_order_track_truncate AFTER TRUNCATE ON order_order EXECUTE FUNCTION track_order_id()"
+    )
+    for table in ["order_note", "order_notereadmarker"]:
+        schema_editor.execute(
+            f"""
+            ALTER TABLE {table} ADD CONSTRAINT {table}_order_id_fk_order_order_id
+            FOREIGN KEY (order_id) REFERENCES order_order_id (id) DEFERRABLE INITIALLY DEFERRED
+            """
+        )
+
+
+def remove_order_ids(schema_editor):
+    for table in ["order_note", "order_notereadmarker"]:
+        schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_order_id_fk_order_order_id")
+    schema_editor.execute("DROP TRIGGER order_order_track_id ON order_order")
+    schema_editor.execute("DROP TRIGGER order_order_track_truncate ON order_order")
+    schema_editor.execute("DROP FUNCTION track_order_id()")
+    schema_editor.execute("DROP TABLE order_order_id")
+
+
+def partition_tables(apps, schema_editor):
+    partition_table(schema_editor, "order_order", "PARTITION BY LIST (status)", ["id", "status"], "order_order_active")
+    create_order_partitions(schema_editor)
+    partition_table(schema_editor, "order_note", "PARTITION BY RANGE (created)", ["id", "created"], "order_note_default")
+    create_note_partitions(schema_editor)
+    add_order_ids(schema_editor)
+
+
+def unpartition_tables(apps, schema_editor):
+    remove_order_ids(schema_editor)
+    unpartition_table(schema_editor, "order_note")
+    unpartition_table(schema_editor, "order_order")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0017_notereadmarker'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, to='order.order'),
+        ),
+        migrations.AlterField(
+            model_name='notereadmarker',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to='order.order'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
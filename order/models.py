@@ -1,6 +1,13 @@
+from collections import defaultdict
+
 from accounts.models import User
 from album.models import Album
-from django.db import models
+from core.search import SearchVectorQuerySet
+from core.sync import ChangeTxidField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F
 from django.utils import timezone
 from rest_framework.serializers import ValidationError
 
@@ -20,14 +27,135 @@ class Order(models.Model):
     status = models.PositiveSmallIntegerField(choices=STATUSES, default=2)
     cost = models.FloatField(null=True, blank=True)
     currency = models.CharField(max_length=3, choices=CURRENCIES, default="EUR")
-    vendor = models.ForeignKey(User, related_name="vendor", on_delete=models.PROTECT)
-    client = models.ForeignKey(User, related_name="client", on_delete=models.PROTECT, blank=True)
+    vendor = models.ForeignKey(User, related_name="vendor", on_delete=models.PROTECT, db_index=False)
+    client = models.ForeignKey(User, related_name="client", on_delete=models.PROTECT, blank=True, db_index=False)
     album = models.ForeignKey(Album, on_delete=models.SET_NULL, null=True, blank=True)
     created = models.DateTimeField(default=timezone.now)
+    search_vector = SearchVectorField(null=True, editable=False)
+    change_txid = ChangeTxidField()
+
+    objects = SearchVectorQuerySet.as_manager()
+
+    search_vector_fields = ["vendor__profile__name", "client__first_name", "client__last_name", "client__email"]
+
+    REVENUE_STATUSES = [5, 6]
+    STATS_FIELDS = ["vendor_id", "status", "currency", "cost", "created"]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.STATS_FIELDS).issubset(field_names):
+            instance._loaded_stats_bucket = instance.get_stats_bucket()
+        return instance
+
+    def get_stats_bucket(self):
+        month = timezone.localtime(self.created).date().replace(day=1)
+        return (self.vendor_id, self.status, self.currency, month, self.cost or 0)
+
+    # The table is partitioned by status into active and archived (canceled, rejected and finished) orders.
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["client", "-created"], name="order_client_created_idx"),
+            models.Index(fields=["vendor", "-created"], name="order_vendor_created_idx"),
+            models.Index(fields=["client", "change_txid", "id"], name="order_client_change_idx"),
+            models.Index(fields=["vendor", "change_txid", "id"], name="order_vendor_change_idx"),
+        ]
+
+
+def lock_orders(ids):
+    """
+    Locks the orders until the end of the transaction by their rows in order_order_id, which never move.
+    Rows of order_order move between partitions when their status changes, locking one that a concurrent
+    transaction moved fails with a serialization error instead of waiting for it.
+    No key update, so notes and read markers can still be created while the orders are locked.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM order_order_id WHERE id = ANY(%s) ORDER BY id FOR NO KEY UPDATE", [list(ids)])
+
+
+class OrderStatsManager(models.Manager):
+    def add(self, key, orders, revenue):
+        vendor_id, status, currency, month = key
+        lookup = {"vendor_id": vendor_id, "status": status, "currency": currency, "month": month}
+        changes = {"orders": F("orders") + orders, "revenue": F("revenue") + revenue}
+        if self.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(**lookup, orders=orders, revenue=revenue)
+        except IntegrityError:
+            self.filter(**lookup).update(**changes)
+
+    def move_many(self, moves):
+        changes = defaultdict(lambda: [0, 0])
+        for old_bucket, new_bucket in moves:
+            if old_bucket == new_bucket:
+                continue
+            for bucket, sign in [(old_bucket, -1), (new_bucket, 1)]:
+                if bucket is not None:
+                    *key, cost = bucket
+                    changes[tuple(key)][0] += sign
+                    changes[tuple(key)][1] += sign * cost
+        for key, (orders, revenue) in changes.items():
+            if orders or revenue:
+                self.add(key, orders, revenue)
+
+    def move(self, old_bucket, new_bucket):
+        self.move_many([(old_bucket, new_bucket)])
+
+
+class OrderStats(models.Model):
+    """
+    Order count and cost sum per vendor, status, currency and month of order creation.
+    Maintained by order signals, `rebuild_order_stats` recomputes it from scratch.
+    """
+
+    vendor = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    status = models.PositiveSmallIntegerField(choices=Order.STATUSES)
+    currency = models.CharField(max_length=3, choices=Order.CURRENCIES)
+    month = models.DateField()
+    orders = models.IntegerField(default=0)
+    revenue = models.FloatField(default=0)
+
+    objects = OrderStatsManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "status", "currency", "month"], name="order_stats_bucket_unique")
+        ]
 
 
 class Note(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+    # Orders are partitioned, so their primary key includes the status and cannot be referenced. The database
+    # references order_order_id instead, the table of unique order ids maintained by a trigger, see migration 0018.
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, db_index=False, db_constraint=False)
     note = models.TextField()
     created = models.DateTimeField(default=timezone.now)
+    change_txid = ChangeTxidField()
+
+    # The table is partitioned by month of creation, see `create_note_partitions` and `detach_note_partitions`.
+    class Meta:
+        indexes = [
+            models.Index(fields=["order", "-created"], name="note_order_created_idx"),
+            models.Index(fields=["order", "change_txid", "id"], name="note_order_change_idx"),
+        ]
+
+
+class NoteReadMarker(models.Model):
+    """
+    Notes of the order not read yet by the user, kept for the vendor and the client of every order.
+    Incremented by notes of the other side and reset when the user marks the order's notes as read.
+    """
+
+    # References order_order_id in the database, like `Note.order`.
+    order = models.ForeignKey(
+        Order, related_name="read_markers", on_delete=models.CASCADE, db_index=False, db_constraint=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    unread = models.PositiveIntegerField(default=0)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["order", "user"], name="note_read_marker_unique")]
@@ -1,16 +1,18 @@
 from accounts.serializers import UserBasicInfoSerializer, UserSerializer
 from album.serializers import AlbumSerializer
+from core.fieldsets import SparseFieldsetsMixin
 from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from .models import Note, Order
+from .transitions import validate_cost_change, validate_transition
 
 
 class NoteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Note
-        exclude = ["order"]
+        exclude = ["order", "change_txid"]
         read_only_fields = ["created", "user"]
 
 
@@ -36,63 +38,26 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
         fields = ["id", "album", "cost", "currency", "status", "status_display"]
 
     def validate(self, attrs):
-        current_status = self.instance.status
         request = self.context["request"]
-        if "album" in attrs:
+        if attrs.get("album") is not None:
             new_album = attrs["album"]
-            if new_album == self.instance.vendor.profile.portfolio:
+            profile = getattr(self.instance.vendor, "profile", None)
+            if profile is not None and new_album.pk == profile.portfolio_id:
                 raise ValidationError({"album": "You cannot assign portfolio to orders."})
         if "status" in attrs:
-            new_status = attrs["status"]
-            if self.instance.status in [0, 1, 6]:
-                raise ValidationError(
-                    {"status": 'You cannot change order status when is is "Canceled", "Rejected" or "Finished".'}
-                )
-            if request.user == self.instance.client:
-                if new_status != 0 or current_status != 2:
-                    raise ValidationError(
-                        {
-                            "status": 'You can only set status to "Canceled" when order\'s status is "Waiting for acceptance"'
-                        }
-                    )
-            if request.user == self.instance.vendor:
-                if new_status == 4 and self.instance.cost == None and ("cost" not in attrs):
-                    raise ValidationError(
-                        {"status": 'You can only set status to "Waiting for payment" when cost in order is set!'}
-                    )
-                if current_status == 2 and new_status not in [1, 3]:
-                    raise ValidationError(
-                        {
-                            "status": 'You can only set status to "Canceled" or "Accepted" when order\'s status is "Waiting for acceptance"'
-                        }
-                    )
-                if current_status == 3 and new_status not in [0, 4, 6]:
-                    raise ValidationError(
-                        {
-                            "status": 'You can only set status to "Canceled", "Waiting for payment" or "Finished" when order\'s status is "Accepted"'
-                        }
-                    )
-                if current_status == 4 and new_status not in [0, 5, 6]:
-                    raise ValidationError(
-                        {
-                            "status": 'You can only set status to  "Canceled", "Payment received" or "Finished" when order\'s status is "Waiting for payment"'
-                        }
-                    )
-                if current_status == 5 and new_status not in [0, 6]:
-                    raise ValidationError(
-                        {
-                            "status": 'You can only set status to  "Canceled" or "Finished" when order\'s status is "Payment received"'
-                        }
-                    )
+            validate_transition(self.instance, request.user, attrs["status"], attrs)
         if "cost" in attrs:
-            if request.user == self.instance.vendor and current_status not in [3, 4]:
-                raise ValidationError(
-                    {"status": 'You can only change cost when order status is "Accepted" or "Waiting for payment"'}
-                )
+            validate_cost_change(self.instance, request.user)
         return attrs
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
 
-class OrderNestedSerializer(serializers.ModelSerializer):
+
+class OrderNestedSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     vendor = UserSerializer(read_only=True)
     client = UserSerializer(read_only=True)
     # notes = serializers.SerializerMethodField(read_only=True)
@@ -103,7 +68,7 @@ class OrderNestedSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = "__all__"
+        exclude = ["search_vector", "change_txid"]
         read_only_field = ["album"]
 
     def get_profile_name(self, obj):
@@ -122,15 +87,58 @@ class OrderNestedSerializer(serializers.ModelSerializer):
         return payment_info
 
 
-class OrderListSerializer(serializers.ModelSerializer):
+class OrderListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     vendor = UserBasicInfoSerializer(read_only=True)
     client = UserBasicInfoSerializer(read_only=True)
     status_display = serializers.CharField(source="get_status_display", read_only=True)
     profile_name = serializers.SerializerMethodField(read_only=True)
+    unread_notes = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Order
-        exclude = ["album", "status"]
+        exclude = ["album", "status", "search_vector", "change_txid"]
 
     def get_profile_name(self, obj):
         return obj.vendor.profile.name
+
+
+class OrderSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        exclude = ["search_vector", "change_txid"]
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    order = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Order.STATUSES)
+
+
+class OrderBulkTransitionSerializer(serializers.Serializer):
+    transitions = OrderTransitionSerializer(many=True, allow_empty=False)
+
+    def validate_transitions(self, transitions):
+        order_ids = [transition["order"] for transition in transitions]
+        if len(order_ids) != len(set(order_ids)):
+            raise ValidationError("Each order can be transitioned only once.")
+        return transitions
+
+
+class OrderStatusStatsSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.STATUSES)
+    status_display = serializers.SerializerMethodField()
+    orders = serializers.IntegerField()
+
+    def get_status_display(self, obj):
+        return dict(Order.STATUSES)[obj["status"]]
+
+
+class OrderRevenueStatsSerializer(serializers.Serializer):
+    currency = serializers.ChoiceField(choices=Order.CURRENCIES)
+    month = serializers.DateField()
+    orders = serializers.IntegerField()
+    revenue = serializers.FloatField()
+
+
+class OrderStatsSerializer(serializers.Serializer):
+    statuses = OrderStatusStatsSerializer(many=True)
+    revenue = OrderRevenueStatsSerializer(many=True)
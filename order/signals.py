@@ -0,0 +1,58 @@
+from core.search import search_vector_outdated
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Note, NoteReadMarker, Order, OrderStats
+from .streams import publish_note
+
+
+def stats_fields_updated(update_fields):
+    if update_fields is None:
+        return True
+    names = {Order._meta.get_field(name).name for name in update_fields}
+    return any(Order._meta.get_field(name).name in names for name in Order.STATS_FIELDS)
+
+
+@receiver(pre_save, sender=Order)
+def order_pre_save(sender, instance, update_fields, *args, **kwargs):
+    if instance._state.adding:
+        instance._loaded_stats_bucket = None
+    elif not hasattr(instance, "_loaded_stats_bucket") and stats_fields_updated(update_fields):
+        # Instances loaded with deferred fields do not know their stored bucket. Django saves only their loaded
+        # fields, so the bucket is read only when some of them can move the order to another one.
+        instance._loaded_stats_bucket = Order.objects.get(pk=instance.pk).get_stats_bucket()
+
+
+@receiver(post_save, sender=Order)
+def order_post_save(sender, instance, created, update_fields, *args, **kwargs):
+    if search_vector_outdated(created, update_fields, Order.search_vector_fields):
+        Order.objects.filter(pk=instance.pk).update_search_vector()
+
+    if hasattr(instance, "_loaded_stats_bucket"):
+        bucket = instance.get_stats_bucket()
+        OrderStats.objects.move(instance._loaded_stats_bucket, bucket)
+        instance._loaded_stats_bucket = bucket
+
+    if created:
+        markers = [
+            NoteReadMarker(order=instance, user_id=user_id) for user_id in {instance.vendor_id, instance.client_id}
+        ]
+        NoteReadMarker.objects.bulk_create(markers, ignore_conflicts=True)
+
+
+@receiver(post_delete, sender=Order)
+def order_post_delete(sender, instance, *args, **kwargs):
+    OrderStats.objects.move(getattr(instance, "_loaded_stats_bucket", instance.get_stats_bucket()), None)
+
+
+@receiver(post_save, sender=Note)
+def note_post_save(sender, instance, created, *args, **kwargs):
+    if created:
+        NoteReadMarker.objects.filter(order_id=instance.order_id).exclude(user_id=instance.user_id).update(
+            unread=F("unread") + 1
+        )
+
+    event = "created" if created else "updated"
+    transaction.on_commit(lambda: publish_note(instance, event))
@@ -0,0 +1,81 @@
+import asyncio
+
+from core.asgi_utils import authenticate, get_request, get_response_headers, run_sync, send_exception
+from core.broker import get_broker
+from core.renderers import CamelCaseJSONRenderer
+from rest_framework import exceptions
+
+from .models import Order
+from .serializers import NoteSerializer
+
+KEEPALIVE_INTERVAL = 15
+
+
+def get_notes_channel(order_id):
+    return f"order-notes-{order_id}"
+
+
+def publish_note(note, event):
+    data = CamelCaseJSONRenderer().render(NoteSerializer(note).data).decode()
+    get_broker().publish(get_notes_channel(note.order_id), {"event": event, "data": data})
+
+
+def check_subscription(request, order_pk):
+    # Same rules as NoteViewSet.list.
+    user = authenticate(request)
+    if not user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    order = Order.objects.filter(pk=order_pk).values("vendor_id", "client_id").first()
+    if order is None:
+        raise exceptions.NotFound({"order_pk": "No order matches the given order number."})
+    if user.pk not in (order["vendor_id"], order["client_id"]):
+        raise exceptions.PermissionDenied()
+
+
+def format_event(message):
+    return f"event: {message['event']}\ndata: {message['data']}\n\n".encode()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def order_notes_stream(scope, receive, send, order_pk):
+    """
+    Server-sent events with notes created or edited in the order, for its vendor and client.
+    Authenticates like the REST endpoints, so the `access-token` cookie is enough for `EventSource`.
+    """
+    request = get_request(scope)
+    try:
+        await run_sync(check_subscription, request, order_pk)
+    except exceptions.APIException as exc:
+        return await send_exception(send, request, exc)
+
+    headers = get_response_headers(request) + [
+        (b"content-type", b"text/event-stream"),
+        (b"cache-control", b"no-cache"),
+        (b"x-accel-buffering", b"no"),
+    ]
+    async with get_broker().subscribe(get_notes_channel(order_pk)) as queue:
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b": connected\n\n", "more_body": True})
+
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        message = asyncio.ensure_future(queue.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {disconnect, message}, timeout=KEEPALIVE_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnect in done:
+                    break
+                if message in done:
+                    body = format_event(message.result())
+                    message = asyncio.ensure_future(queue.get())
+                else:
+                    body = b": keepalive\n\n"
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        finally:
+            disconnect.cancel()
+            message.cancel()
@@ -1,5 +1,16 @@
+import json
 import shutil
-
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from accounts.models import Profile
+from album.models import Album
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from core.asgi import application
 from core.settings import TEST_DIR
 from core.tests_utils import (
     album_image_list_url,
@@ -10,9 +21,22 @@ from core.tests_utils import (
     order_list_url,
     order_note_detail_url,
     order_note_list_url,
+    order_note_read_url,
+    order_note_stream_url,
+    order_stats_url,
+    order_transitions_url,
+    profile_list_url,
 )
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Note, NoteReadMarker, Order, OrderStats, lock_orders
+from .views import OrderViewSet
 
 
 class TestOrderViewset(APITestCase):
@@ -56,6 +80,21 @@ class TestOrderViewset(APITestCase):
         response = self.client.get(image_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_order_search(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(profile_list_url, {"description": "DESC", "name": "Studio"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.user.last_name = "Kowalski"
+        self.user.save()
+        response = self.client.get(order_list_url, {"search": "kowal"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([order["id"] for order in response.json()["results"]], [self.order_id])
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(order_list_url, {"search": "stud"})
+        self.assertEqual([order["id"] for order in response.json()["results"]], [self.order_id])
+        response = self.client.get(order_list_url, {"search": "other"})
+        self.assertEqual(response.json()["results"], [])
+
     def test_order_update_client_status(self):
         for i in range(1, 7):
             response = self.client.patch(self.order_url, {"status": i})
@@ -79,6 +118,24 @@ class TestOrderViewset(APITestCase):
         response = self.client.patch(self.order_url, {"album": album_id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_order_update_vendor_album_queries(self):
+        self.client.force_authenticate(user=self.vendor)
+        response = self.client.post(album_list_url, {"name": "NAME", "is_public": True})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        album_id = response.json()["id"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(self.order_url, {"album": album_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = [query["sql"] for query in context.captured_queries if "SAVEPOINT" not in query["sql"]]
+        # Including the lock of the order in order_order_id.
+        self.assertEqual(len(queries), 6)
+        album = Album.objects.get(pk=album_id)
+        self.assertFalse(album.is_public)
+        self.assertEqual(list(album.allowed_users.all()), [self.user])
+        response = self.client.patch(self.order_url, {"album": None}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(album.allowed_users.all()), [])
+
     def test_order_update_vendor_cost(self):
         self.client.force_authenticate(user=self.vendor)
         response = self.client.patch(self.order_url, {"cost": 1})
@@ -264,6 +321,207 @@ class TestOrderViewset(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TestOrderViewsetQueries(APITestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com")
+        Profile.objects.create(name="NAME", description="DESC", owner=self.vendor)
+        self.user = create_user("user@test.com")
+        self.client.force_authenticate(user=self.user)
+
+    def create_orders(self, count):
+        for _ in range(count):
+            response = self.client.post(order_list_url, {"vendor": self.vendor.id, "description": "DESC"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()["id"]
+
+    def test_order_list_queries(self):
+        self.create_orders(1)
+        with self.assertNumQueries(2):
+            response = self.client.get(order_list_url)
+        self.assertEqual(response.json()["results"][0]["profileName"], "NAME")
+        self.create_orders(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(order_list_url)
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_order_list_sparse_fields(self):
+        self.create_orders(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(order_list_url, {"fields": "id,statusDisplay"})
+        self.assertEqual(list(response.json()["results"][0]), ["id", "statusDisplay"])
+        self.assertNotIn("JOIN", queries.captured_queries[-1]["sql"])
+
+    def test_order_retrieve_queries(self):
+        order_id = self.create_orders(1)
+        with self.assertNumQueries(1):
+            response = self.client.get(order_detail_url(order_id))
+        self.assertEqual(response.json()["paymentInfo"], "")
+        self.assertEqual(response.json()["vendor"]["profile"], self.vendor.profile.id)
+
+
+class TestOrderStats(APITestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        self.client.force_authenticate(user=self.user)
+        self.order_urls = []
+        for _ in range(3):
+            response = self.client.post(order_list_url, {"vendor": self.vendor.id, "description": "DESC"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.order_urls.append(order_detail_url(response.json()["id"]))
+        self.client.force_authenticate(user=self.vendor)
+
+    def pay(self, order_url, cost, currency):
+        for data in [{"status": 3}, {"status": 4, "cost": cost, "currency": currency}, {"status": 5}]:
+            response = self.client.patch(order_url, data)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def get_stats(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(order_stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_order_stats(self):
+        self.assertEqual(
+            self.get_stats()["statuses"], [{"status": 2, "statusDisplay": "Waiting for acceptance", "orders": 3}]
+        )
+        self.assertEqual(self.get_stats()["revenue"], [])
+
+        self.pay(self.order_urls[0], 100, "PLN")
+        self.pay(self.order_urls[1], 50, "PLN")
+        response = self.client.patch(self.order_urls[2], {"status": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        stats = self.get_stats()
+        self.assertEqual([(row["status"], row["orders"]) for row in stats["statuses"]], [(1, 1), (5, 2)])
+        month = timezone.localdate().replace(day=1).isoformat()
+        self.assertEqual(stats["revenue"], [{"currency": "PLN", "month": month, "orders": 2, "revenue": 150.0}])
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.get_stats(), {"statuses": [], "revenue": []})
+
+    def test_order_stats_deferred_save(self):
+        order = Order.objects.only("id", "description").order_by("pk").first()
+        order.description = "EDITED"
+        # Only the description is saved, it cannot move the order to another bucket.
+        with self.assertNumQueries(1):
+            order.save()
+
+        order = Order.objects.only("id", "status").get(pk=order.pk)
+        order.status = 3
+        order.save()
+        statuses = OrderStats.objects.filter(orders__gt=0).values_list("status", "orders")
+        self.assertCountEqual(statuses, [(2, 2), (3, 1)])
+
+    def test_order_stats_rebuild(self):
+        self.pay(self.order_urls[0], 100, "EUR")
+        expected = list(OrderStats.objects.filter(orders__gt=0).values_list("status", "currency", "orders", "revenue"))
+        call_command("rebuild_order_stats", stdout=StringIO())
+        rebuilt = list(OrderStats.objects.values_list("status", "currency", "orders", "revenue"))
+        self.assertCountEqual(rebuilt, expected)
+
+
+class TestOrderBulkTransitions(APITestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        self.client.force_authenticate(user=self.user)
+        self.order_ids = []
+        for _ in range(4):
+            response = self.client.post(order_list_url, {"vendor": self.vendor.id, "description": "DESC"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.order_ids.append(response.json()["id"])
+        self.client.force_authenticate(user=self.vendor)
+
+    def transition(self, *transitions):
+        data = {"transitions": [{"order": order_id, "status": status} for order_id, status in transitions]}
+        return self.client.post(order_transitions_url, data, format="json")
+
+    def get_statuses(self):
+        return list(Order.objects.filter(pk__in=self.order_ids).order_by("pk").values_list("status", flat=True))
+
+    def test_order_bulk_transitions(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.transition(*[(order_id, 3) for order_id in self.order_ids[:2]], (self.order_ids[2], 1))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([order["status"] for order in response.json()], [3, 3, 1])
+        self.assertEqual(self.get_statuses(), [3, 3, 1, 2])
+        updates = [query for query in context.captured_queries if query["sql"].startswith('UPDATE "order_order"')]
+        self.assertEqual(len(updates), 2)
+
+        response = self.client.get(order_stats_url)
+        statuses = [(row["status"], row["orders"]) for row in response.json()["statuses"]]
+        self.assertEqual(statuses, [(1, 1), (2, 1), (3, 2)])
+
+    def test_order_bulk_transitions_invalid(self):
+        response = self.transition((self.order_ids[0], 3), (self.order_ids[1], 4))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["transitions"][0], {})
+        self.assertIn("status", response.json()["transitions"][1])
+        self.assertEqual(self.get_statuses(), [2, 2, 2, 2])
+
+        response = self.transition((self.order_ids[0], 3), (self.order_ids[0], 1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=create_user())
+        response = self.transition((self.order_ids[0], 1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("order", response.json()["transitions"][0])
+
+    def test_order_bulk_transitions_client(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.transition((self.order_ids[0], 3))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.transition((self.order_ids[0], 0), (self.order_ids[1], 0))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_statuses(), [0, 0, 2, 2])
+
+
+class TestOrderConcurrentTransitions(APITransactionTestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        self.order = Order.objects.create(vendor=self.vendor, client=self.user, description="DESC")
+        self.client.force_authenticate(user=self.vendor)
+
+    def cancel_concurrently(self, request):
+        """
+        Sends `request` while another connection cancels the order, which moves it to the archive partition,
+        and commits only after the request waits for its lock.
+        """
+        locked = threading.Event()
+
+        def cancel():
+            try:
+                with transaction.atomic():
+                    lock_orders([self.order.pk])
+                    Order.objects.filter(pk=self.order.pk).update(status=0)
+                    locked.set()
+                    time.sleep(0.5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=cancel)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(5))
+            return request()
+        finally:
+            thread.join()
+
+    def test_order_update_waits_for_concurrent_cancel(self):
+        response = self.cancel_concurrently(lambda: self.client.patch(order_detail_url(self.order.id), {"status": 1}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("when it is", response.json()["status"][0])
+
+    def test_order_bulk_transitions_wait_for_concurrent_cancel(self):
+        data = {"transitions": [{"order": self.order.id, "status": 1}]}
+        response = self.cancel_concurrently(lambda: self.client.post(order_transitions_url, data, format="json"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("status", response.json()["transitions"][0])
+
+
 class TestOrderNoteViewset(APITestCase):
     data_note = {"note": "NOTE"}
 
@@ -301,3 +559,245 @@ class TestOrderNoteViewset(APITestCase):
         note_id = response.json()["id"]
         response = self.client.patch(order_note_detail_url(self.order_id, note_id), self.data_note)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def get_unread_notes(self):
+        response = self.client.get(order_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"][0]["unreadNotes"]
+
+    def test_order_note_unread_notes(self):
+        Profile.objects.create(name="NAME", description="DESC", owner=self.vendor)
+        self.client.post(self.order_note_url, self.data_note)
+        self.assertEqual(self.get_unread_notes(), 0)
+
+        self.client.force_authenticate(user=self.vendor)
+        self.assertEqual(self.get_unread_notes(), 1)
+        self.client.post(self.order_note_url, self.data_note)
+        self.client.post(self.order_note_url, self.data_note)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.get_unread_notes(), 2)
+        response = self.client.post(order_note_read_url(self.order_id))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get_unread_notes(), 0)
+
+        self.client.force_authenticate(user=self.vendor)
+        self.assertEqual(self.get_unread_notes(), 1)
+
+    def test_order_note_read_forbidden(self):
+        self.client.force_authenticate(user=create_user("other@test.com"))
+        response = self.client.post(order_note_read_url(self.order_id))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestOrderNoteStream(APITransactionTestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        self.order = Order.objects.create(vendor=self.vendor, client=self.user, description="DESC")
+        self.stream_url = order_note_stream_url(self.order.id)
+
+    def get_communicator(self, path, user=None):
+        headers = [(b"host", b"testserver")]
+        if user is not None:
+            headers.append((b"cookie", f"access-token={RefreshToken.for_user(user).access_token}".encode()))
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers}
+        return ApplicationCommunicator(application, scope)
+
+    async def open_stream(self, user):
+        communicator = self.get_communicator(self.stream_url, user)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        body = await communicator.receive_output(timeout=5)
+        self.assertEqual(body["body"], b": connected\n\n")
+        return communicator
+
+    async def receive_event(self, communicator):
+        lines = (await communicator.receive_output(timeout=5))["body"].decode().splitlines()
+        return lines[0].split(": ", 1)[1], json.loads(lines[1].split(": ", 1)[1])
+
+    async def get_error_status(self, path, user=None):
+        communicator = self.get_communicator(path, user)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        await communicator.wait(timeout=5)
+        return start["status"]
+
+    async def test_order_note_stream_vendor_and_client_receive_notes(self):
+        vendor_stream = await self.open_stream(self.vendor)
+        client_stream = await self.open_stream(self.user)
+
+        self.client.force_authenticate(user=self.user)
+        response = await sync_to_async(self.client.post)(order_note_list_url(self.order.id), {"note": "NOTE"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        for communicator in (vendor_stream, client_stream):
+            event, data = await self.receive_event(communicator)
+            self.assertEqual(event, "created")
+            self.assertEqual(data["id"], response.json()["id"])
+            self.assertEqual(data["note"], "NOTE")
+
+        response = await sync_to_async(self.client.patch)(
+            order_note_detail_url(self.order.id, data["id"]), {"note": "EDITED"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event, data = await self.receive_event(vendor_stream)
+        self.assertEqual(event, "updated")
+        self.assertEqual(data["note"], "EDITED")
+
+        for communicator in (vendor_stream, client_stream):
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(timeout=5)
+
+    async def test_order_note_stream_permissions(self):
+        other = await sync_to_async(create_user)("other@test.com")
+        self.assertEqual(await self.get_error_status(self.stream_url), status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(await self.get_error_status(self.stream_url, other), status.HTTP_403_FORBIDDEN)
+        missing_url = order_note_stream_url(self.order.id + 1)
+        self.assertEqual(await self.get_error_status(missing_url, self.vendor), status.HTTP_404_NOT_FOUND)
+
+
+class TestOrderSync(APITransactionTestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        self.other = create_user("other@test.com")
+        self.order = Order.objects.create(vendor=self.vendor, client=self.user, description="DESC")
+        Order.objects.create(vendor=self.vendor, client=self.other, description="DESC")
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, url, cursor):
+        response = self.client.get(url, {"since": cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_order_sync(self):
+        data = self.sync(order_list_url, "0")
+        self.assertEqual([order["id"] for order in data["results"]], [self.order.id])
+        self.assertEqual(data["results"][0]["client"], self.user.id)
+        self.assertFalse(data["more"])
+
+        cursor = data["cursor"]
+        self.assertEqual(self.sync(order_list_url, cursor)["results"], [])
+
+        self.client.patch(order_detail_url(self.order.id), {"status": 0})
+        data = self.sync(order_list_url, cursor)
+        self.assertEqual([(order["id"], order["status"]) for order in data["results"]], [(self.order.id, 0)])
+        self.assertEqual(self.sync(order_list_url, data["cursor"])["results"], [])
+
+    def test_order_sync_more(self):
+        orders = [Order.objects.create(vendor=self.vendor, client=self.user, description="DESC") for _ in range(2)]
+        with mock.patch.object(OrderViewSet, "sync_limit", 2):
+            first = self.sync(order_list_url, "0")
+            second = self.sync(order_list_url, first["cursor"])
+        self.assertTrue(first["more"])
+        self.assertFalse(second["more"])
+        ids = [order["id"] for order in first["results"] + second["results"]]
+        self.assertEqual(ids, [self.order.id] + [order.id for order in orders])
+
+    def test_order_sync_invalid_cursor(self):
+        response = self.client.get(order_list_url, {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_note_sync(self):
+        note_url = order_note_list_url(self.order.id)
+        cursor = self.sync(note_url, "0")["cursor"]
+
+        response = self.client.post(note_url, {"note": "NOTE"})
+        data = self.sync(note_url, cursor)
+        self.assertEqual([note["id"] for note in data["results"]], [response.json()["id"]])
+        self.assertEqual(self.sync(note_url, data["cursor"])["results"], [])
+
+    def test_sync_inside_running_transaction_waits_for_commit(self):
+        cursor = self.sync(order_list_url, "0")["cursor"]
+        with transaction.atomic():
+            Order.objects.filter(pk=self.order.pk).update(status=0)
+            # Rows of the running transaction are not listed, nor passed by the cursor.
+            data = self.sync(order_list_url, cursor)
+            self.assertEqual(data["results"], [])
+        data = self.sync(order_list_url, data["cursor"])
+        self.assertEqual([order["id"] for order in data["results"]], [self.order.id])
+
+
+class TestOrderNotePartitions(APITestCase):
+    def setUp(self):
+        self.vendor = create_user("test@test.com", is_vendor=True)
+        self.user = create_user("user@test.com")
+        Profile.objects.create(name="NAME", description="DESC", owner=self.vendor)
+        self.order = Order.objects.create(vendor=self.vendor, client=self.user, description="DESC")
+
+    def get_partition(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {model._meta.db_table} WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
+
+    def test_order_archive_partition(self):
+        self.assertEqual(self.get_partition(Order, self.order.id), "order_order_active")
+        self.order.status = 0
+        self.order.save()
+        self.assertEqual(self.get_partition(Order, self.order.id), "order_order_archive")
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(order_list_url, {"archived": True})
+        self.assertEqual([order["id"] for order in response.json()["results"]], [self.order.id])
+        response = self.client.get(order_list_url, {"archived": False})
+        self.assertEqual(response.json()["results"], [])
+
+    def assert_constraints_violated(self, model, **kwargs):
+        # Foreign keys are checked at commit, rolled back with the row.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            model.objects.create(**kwargs)
+            connection.check_constraints()
+
+    def test_order_ids_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Order.objects.create(id=self.order.id, status=0, vendor=self.vendor, client=self.user, description="DESC")
+
+    def test_order_id_foreign_keys(self):
+        Note.objects.create(order=self.order, user=self.user, note="NOTE")
+        # Moved to the archive partition, the order keeps its id.
+        Order.objects.filter(pk=self.order.pk).update(status=0)
+        connection.check_constraints()
+
+        self.assert_constraints_violated(Note, order_id=self.order.id + 1, user=self.user, note="NOTE")
+
+    def test_order_id_foreign_keys_read_markers(self):
+        self.assert_constraints_violated(NoteReadMarker, order_id=self.order.id + 1, user=self.user)
+
+    def test_create_order_partitions(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE order_order DETACH PARTITION order_order_archive")
+            cursor.execute("DROP TABLE order_order_archive")
+        order = Order.objects.create(status=0, vendor=self.vendor, client=self.user, description="DESC")
+        Note.objects.create(order=order, user=self.user, note="NOTE")
+        self.assertEqual(self.get_partition(Order, order.id), "order_order_active")
+
+        out = StringIO()
+        call_command("create_order_partitions", stdout=out)
+        self.assertIn("Moved 1 archived orders to order_order_archive.", out.getvalue())
+        self.assertEqual(self.get_partition(Order, order.id), "order_order_archive")
+        self.assertEqual(self.get_partition(Order, self.order.id), "order_order_active")
+        connection.check_constraints()
+
+        call_command("create_order_partitions", stdout=out)
+        self.assertIn("The archived orders partition already exists.", out.getvalue())
+
+    def test_order_note_partitions(self):
+        note = Note.objects.create(order=self.order, user=self.user, note="NOTE")
+        self.assertEqual(self.get_partition(Note, note.id), f"order_note_p{timezone.now():%Y_%m}")
+
+        created = timezone.now() - timedelta(days=5 * 365)
+        old_note = Note.objects.create(order=self.order, user=self.user, note="NOTE", created=created)
+        self.assertEqual(self.get_partition(Note, old_note.id), "order_note_default")
+
+        out = StringIO()
+        call_command("create_note_partitions", stdout=out)
+        self.assertIn(f"order_note_p{created:%Y_%m}", out.getvalue())
+        self.assertEqual(self.get_partition(Note, old_note.id), f"order_note_p{created:%Y_%m}")
+
+        call_command("detach_note_partitions", keep=24, stdout=out)
+        self.assertIn("Detached 1 note partitions.", out.getvalue())
+        self.assertFalse(Note.objects.filter(id=old_note.id).exists())
+        self.assertTrue(Note.objects.filter(id=note.id).exists())
@@ -0,0 +1,71 @@
+from rest_framework.exceptions import ValidationError
+
+from .models import Order
+
+CLIENT = "client"
+VENDOR = "vendor"
+
+FINAL_STATUSES = [0, 1, 6]
+
+# Role -> current status -> statuses the order can be moved to.
+TRANSITIONS = {
+    CLIENT: {2: [0]},
+    VENDOR: {2: [1, 3], 3: [0, 4, 6], 4: [0, 5, 6], 5: [0, 6]},
+}
+
+# Role -> statuses in which the order's cost can be changed.
+COST_EDITABLE_STATUSES = {VENDOR: [3, 4]}
+
+
+def has_cost(order, attrs):
+    return order.cost is not None or attrs.get("cost") is not None
+
+
+# Target status -> conditions the order has to meet to be moved there.
+GUARDS = {
+    4: [(has_cost, 'You can only set status to "Waiting for payment" when cost in order is set!')],
+}
+
+
+def get_role(order, user):
+    if user.id == order.vendor_id:
+        return VENDOR
+    if user.id == order.client_id:
+        return CLIENT
+    return None
+
+
+def get_status_names(statuses):
+    names = dict(Order.STATUSES)
+    return " or ".join(f'"{names[status]}"' for status in statuses)
+
+
+def validate_transition(order, user, new_status, attrs=None):
+    attrs = attrs or {}
+    current_status = order.status
+    if current_status in FINAL_STATUSES:
+        raise ValidationError(
+            {"status": f"You cannot change order status when it is {get_status_names(FINAL_STATUSES)}."}
+        )
+
+    allowed_statuses = TRANSITIONS.get(get_role(order, user), {}).get(current_status, [])
+    if new_status not in allowed_statuses:
+        current_name = get_status_names([current_status])
+        allowed_names = get_status_names(allowed_statuses)
+        if allowed_statuses:
+            message = f"You can only set status to {allowed_names} when order's status is {current_name}."
+        else:
+            message = f"You cannot change order status when it is {current_name}."
+        raise ValidationError({"status": message})
+
+    for condition, message in GUARDS.get(new_status, []):
+        if not condition(order, attrs):
+            raise ValidationError({"status": message})
+
+
+def validate_cost_change(order, user):
+    allowed_statuses = COST_EDITABLE_STATUSES.get(get_role(order, user), [])
+    if order.status not in allowed_statuses:
+        raise ValidationError(
+            {"status": f"You can only change cost when order status is {get_status_names(allowed_statuses)}."}
+        )
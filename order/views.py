@@ -1,28 +1,43 @@
+from collections import defaultdict
+
 from album.models import Album
-from core.utils import SwaggerOrderingFilter, SwaggerSearchFilter
-from django.db.models import Q
+from core.fieldsets import fields_parameters, is_field_requested, select_requested_related
+from core.search import FullTextSearchFilter
+from core.sync import ChangeSyncMixin, since_parameter
+from core.utils import SwaggerOrderingFilter
+from django.db import transaction
+from django.db.models import FilteredRelation, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django_filters import rest_framework as filters
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
 from rest_framework import mixins, status, viewsets
-from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Note, Order
+from .models import Note, NoteReadMarker, Order, OrderStats, lock_orders
 from .permissions import CanEdit, IsVendorOrClient
 from .serializers import (
     NoteSerializer,
+    OrderBulkTransitionSerializer,
     OrderCreateSerializer,
     OrderListSerializer,
     OrderNestedSerializer,
+    OrderStatsSerializer,
+    OrderSyncSerializer,
     OrderUpdateSerializer,
 )
+from .transitions import FINAL_STATUSES, validate_transition
 
 
 class OrderFilter(filters.FilterSet):
     is_client = filters.BooleanFilter(field_name="client", method="filter_is_client")
     is_vendor = filters.BooleanFilter(field_name="vendor", method="filter_is_vendor")
+    archived = filters.BooleanFilter(field_name="status", method="filter_archived")
 
     def filter_is_client(self, queryset, name, value):
         lookup = "__".join([name, "exact"])
@@ -32,23 +47,48 @@ class OrderFilter(filters.FilterSet):
         lookup = "__".join([name, "exact"])
         return queryset.filter(**{lookup: self.request.user.id})
 
+    def filter_archived(self, queryset, name, value):
+        # Orders are partitioned the same way, so only one partition is read.
+        if value:
+            return queryset.filter(status__in=FINAL_STATUSES)
+        return queryset.filter(status__in=[status for status, _ in Order.STATUSES if status not in FINAL_STATUSES])
+
     class Meta:
         model = Order
         fields = ["status"]
 
 
-class OrderViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+@method_decorator(name="retrieve", decorator=swagger_auto_schema(manual_parameters=fields_parameters))
+class OrderViewSet(ChangeSyncMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderListSerializer
-    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, SwaggerSearchFilter]
+    sync_serializer_class = OrderSyncSerializer
+    filter_backends = [DjangoFilterBackend, SwaggerOrderingFilter, FullTextSearchFilter]
     filterset_class = OrderFilter
     # filterset_fields = ["client", "vendor", "status"]
     search_fields = ["vendor__profile__name", "client__first_name", "client__last_name", "client__email"]
     ordering_fields = ["created", "status", "cost"]
     ordering = ["-created"]
+    # Relations joined for each field of the serializers, omitted fields are not joined.
+    related = {"vendor": ["vendor"], "client": ["client"], "profile_name": ["vendor__profile"]}
+    retrieve_related = {
+        "vendor": ["vendor__profile"],
+        "client": ["client__profile"],
+        "profile_name": ["vendor__profile"],
+        "payment_info": ["vendor__profile"],
+    }
 
     def get_queryset(self):
-        return self.queryset.filter(Q(client=self.request.user.id) | Q(vendor=self.request.user.id))
+        queryset = self.queryset.filter(Q(client=self.request.user.id) | Q(vendor=self.request.user.id))
+        if self.action == "retrieve":
+            return select_requested_related(queryset, self.request, self.retrieve_related)
+        if self.action == "list" and not self.is_sync_request() and is_field_requested(self.request, "unread_notes"):
+            # Joins the user's read marker instead of counting notes of every order.
+            queryset = queryset.annotate(
+                read_marker=FilteredRelation("read_markers", condition=Q(read_markers__user=self.request.user.id)),
+                unread_notes=Coalesce("read_marker__unread", 0),
+            )
+        return select_requested_related(queryset, self.request, self.related)
 
     def get_serializer_class(self):
         if self.action == "partial_update":
@@ -66,6 +106,96 @@ class OrderViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.Ge
             permission_classes = [IsAuthenticated & IsVendorOrClient]
         return [permission() for permission in permission_classes]
 
+    @swagger_auto_schema(
+        operation_description="""
+        With `since` lists orders created or changed after the cursor, with ids instead of nested users,
+        ignoring filters and ordering. Results come with the next cursor and `more` if another sync is needed at once.
+        """,
+        manual_parameters=[since_parameter, *fields_parameters],
+    )
+    def list(self, request, *args, **kwargs):
+        if self.is_sync_request():
+            return self.sync_list(self.get_queryset().select_related(None))
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="""
+        Dashboard of orders where the user is the vendor.
+        Statuses hold the number of orders in each status.
+        Revenue holds the cost sum of orders with status 5 or 6 by currency and month of order creation.
+        """,
+        responses={status.HTTP_200_OK: OrderStatsSerializer},
+    )
+    @action(detail=False, pagination_class=None, filter_backends=[])
+    def stats(self, request, *args, **kwargs):
+        queryset = OrderStats.objects.filter(vendor=request.user)
+        statuses = queryset.values("status").annotate(orders=Sum("orders")).filter(orders__gt=0).order_by("status")
+        revenue = (
+            queryset.filter(status__in=Order.REVENUE_STATUSES)
+            .values("currency", "month")
+            .annotate(orders=Sum("orders"), revenue=Sum("revenue"))
+            .filter(orders__gt=0)
+            .order_by("-month", "currency")
+        )
+        serializer = OrderStatsSerializer({"statuses": statuses, "revenue": revenue})
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="""
+        Changes statuses of many orders at once.
+        Every transition is validated with the same rules as in updating a single order,
+        if any of them is invalid, none of the orders is changed.
+        """,
+        request_body=OrderBulkTransitionSerializer,
+        responses={status.HTTP_200_OK: OrderUpdateSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        serializer_class=OrderBulkTransitionSerializer,
+        pagination_class=None,
+        filter_backends=[],
+    )
+    def transitions(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        transitions = serializer.validated_data["transitions"]
+        order_ids = [transition["order"] for transition in transitions]
+
+        with transaction.atomic():
+            lock_orders(order_ids)
+            queryset = self.queryset.filter(Q(client=request.user.id) | Q(vendor=request.user.id))
+            orders = queryset.in_bulk(order_ids)
+
+            errors = []
+            for transition in transitions:
+                try:
+                    if transition["order"] not in orders:
+                        raise ValidationError({"order": "No order matches the given order number."})
+                    validate_transition(orders[transition["order"]], request.user, transition["status"])
+                except ValidationError as error:
+                    errors.append(error.detail)
+                else:
+                    errors.append({})
+            if any(errors):
+                raise ValidationError({"transitions": errors})
+
+            moves = []
+            order_ids_by_status = defaultdict(list)
+            for transition in transitions:
+                order = orders[transition["order"]]
+                old_bucket = order.get_stats_bucket()
+                order.status = transition["status"]
+                moves.append((old_bucket, order.get_stats_bucket()))
+                order_ids_by_status[order.status].append(order.pk)
+
+            for new_status, ids in order_ids_by_status.items():
+                Order.objects.filter(pk__in=ids).update(status=new_status)
+            OrderStats.objects.move_many(moves)
+
+        response_serializer = OrderUpdateSerializer([orders[order_id] for order_id in order_ids], many=True)
+        return Response(response_serializer.data)
+
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
         data["client"] = request.user.id
@@ -77,8 +207,7 @@ class OrderViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.Ge
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    @swagger_auto_schema(
-        operation_description="""
+    @swagger_auto_schema(operation_description="""
         **Available statuses:**
         
         The created orders have default status of 2.
@@ -104,33 +233,37 @@ class OrderViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.Ge
                 * If setting to 4, cost cannot be null.
             * 4 -> 0, 5, 6
             * 5 -> 0 or 6
-        """
-    )
+        """)
+    @transaction.atomic
     def partial_update(self, request, *args, **kwargs):
+        # Other ids match no order, get_object() answers them.
+        if self.kwargs["pk"].isdigit():
+            lock_orders([int(self.kwargs["pk"])])
         instance = self.get_object()
 
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
 
-        if "album" in request.data and request.data["album"] == None:
-            album = instance.album
-            album.allowed_users.remove(instance.client)
-            album.save()
-
+        old_album_id = instance.album_id
         instance = serializer.save()
 
-        if "album" in request.data and request.data["album"] != None:
-            album = instance.album
-            album.allowed_users.add(instance.client)
-            album.is_public = False
-            album.save()
+        if "album" in serializer.validated_data and instance.album_id != old_album_id:
+            if instance.album is None:
+                Album.allowed_users.through.objects.filter(album=old_album_id, user=instance.client_id).delete()
+            else:
+                album = instance.album
+                album.allowed_users.add(instance.client_id)
+                if album.is_public:
+                    album.is_public = False
+                    album.save(update_fields=["is_public"])
 
         return Response(serializer.data)
 
 
-class NoteViewSet(viewsets.GenericViewSet):
+class NoteViewSet(ChangeSyncMixin, viewsets.GenericViewSet):
     queryset = Order.objects.all()
     serializer_class = NoteSerializer
+    sync_serializer_class = NoteSerializer
     permission_classes = [IsVendorOrClient]
 
     def get_object(
@@ -147,9 +280,19 @@ class NoteViewSet(viewsets.GenericViewSet):
 
     #     notes = obj.note_set.all()
     #     return NoteSerializer(notes, many=True).data
+    def get_note_queryset(self, order):
+        # Notes cannot predate their order, the bound skips older partitions of notes.
+        return order.note_set.filter(created__gte=order.created).order_by("-created")
+
+    @swagger_auto_schema(
+        operation_description="With `since` lists notes created or edited after the cursor, like orders list.",
+        manual_parameters=[since_parameter],
+    )
     def list(self, request, *args, **kwargs):
         order = self.get_object()
-        queryset = order.note_set.all().order_by("-created")
+        if self.is_sync_request():
+            return self.sync_list(self.get_note_queryset(order))
+        queryset = self.get_note_queryset(order)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -159,6 +302,18 @@ class NoteViewSet(viewsets.GenericViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        operation_description="Mark notes of specified order as read, resets unread notes of the order for the user.",
+        request_body=no_body,
+        responses={status.HTTP_204_NO_CONTENT: ""},
+    )
+    @action(detail=False, methods=["post"])
+    def read(self, request, *args, **kwargs):
+        order = self.get_object()
+        marker = {"unread": 0, "read_at": timezone.now()}
+        NoteReadMarker.objects.update_or_create(order=order, user=request.user, defaults=marker)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @swagger_auto_schema(operation_description="Add note to specified order.")
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)